@@ -41,12 +41,13 @@ ALLOWED_HOSTS = ["127.0.0.1"]
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    "movies_admin.apps.MoviesAdminSiteConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "movies_admin.apps.MoviesAdminConfig",
     "debug_toolbar",
 ]
@@ -79,3 +80,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOCALE_PATHS = ["movies_admin/locale"]
 
 INTERNAL_IPS = ["127.0.0.1"]
+
+# Changelists count exactly below the threshold and use the planner's row
+# estimate above it; counts are cached for the timeout in seconds
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv("ADMIN_COUNT_ESTIMATE_THRESHOLD", 10000)
+)
+ADMIN_COUNT_CACHE_TIMEOUT = int(os.getenv("ADMIN_COUNT_CACHE_TIMEOUT", 60))
+
+# Autocomplete returns pages of this size without counting, caching them
+# for the timeout in seconds or until a person or genre is saved; use a
+# shared CACHES backend to invalidate across workers
+AUTOCOMPLETE_LIMIT = int(os.getenv("AUTOCOMPLETE_LIMIT", 20))
+AUTOCOMPLETE_CACHE_TIMEOUT = int(os.getenv("AUTOCOMPLETE_CACHE_TIMEOUT", 300))
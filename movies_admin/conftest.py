@@ -0,0 +1,44 @@
+import os
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "tests")
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+
+@pytest.fixture(scope="session")
+def django_db_setup():
+    if not connection.settings_dict["NAME"]:
+        pytest.skip("DB_NAME is not set")
+    setup_test_environment()
+    creation = connection.creation
+    old_name = connection.settings_dict["NAME"]
+    # the models live in the content schema, which the migrations expect
+    # to exist already
+    test_name = creation._create_test_db(
+        verbosity=0, autoclobber=True, keepdb=False
+    )
+    connection.settings_dict["NAME"] = test_name
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE SCHEMA IF NOT EXISTS content")
+    connection.close()
+    connection.settings_dict["NAME"] = old_name
+    creation.create_test_db(verbosity=0, keepdb=True)
+    yield
+    creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def db(django_db_setup):
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
@@ -1,7 +1,81 @@
+import math
+import re
+
 from django.contrib import admin
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import (
+    Exists,
+    ExpressionWrapper,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+)
+from django.db.models.functions import Left
+from django.db.models.lookups import Exact
 from django.utils.translation import gettext_lazy as _
 
-from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+from .keyset import KeysetChangeList, KeysetPaginationMixin
+from .models import (
+    FilmWork,
+    Genre,
+    GenreFilmWork,
+    Person,
+    PersonFilmWork,
+    rating_sort_key,
+)
+from .paginator import EstimatedCountPaginator
+
+SEARCH_CONFIG = "english"
+DESCRIPTION_PREVIEW_LENGTH = 100
+
+
+def substring_pattern(search_term):
+    # ~* can use the gin_trgm_ops indexes, UPPER(...) LIKE of icontains can't
+    return re.escape(search_term)
+
+
+class EstimatedCountMixin:
+    paginator = EstimatedCountPaginator
+    # skips the second, unfiltered COUNT(*) of the changelist
+    show_full_result_count = False
+
+
+class GenreListFilter(admin.SimpleListFilter):
+    title = _("genres")
+    parameter_name = "genre"
+
+    def lookups(self, request, model_admin):
+        return Genre.objects.order_by("name").values_list("id", "name")
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        # EXISTS instead of a join, so the changelist needs no DISTINCT
+        return queryset.filter(
+            Exists(
+                GenreFilmWork.objects.filter(
+                    film_work=OuterRef("pk"), genre_id=self.value()
+                )
+            )
+        )
+
+
+class FilmWorkChangeList(KeysetChangeList):
+    def get_queryset(self, request):
+        # the list shows a preview, the full description stays in the DB
+        return (
+            super()
+            .get_queryset(request)
+            .defer("description", "search_vector")
+            .annotate(
+                description_preview=Left(
+                    "description", DESCRIPTION_PREVIEW_LENGTH
+                )
+            )
+        )
 
 
 class GenreFilmWorkInline(admin.TabularInline):
@@ -15,33 +89,104 @@ class PersonFilmWorkInline(admin.TabularInline):
 
 
 @admin.register(FilmWork)
-class FilmWorkAdmin(admin.ModelAdmin):
+class FilmWorkAdmin(
+    KeysetPaginationMixin, EstimatedCountMixin, admin.ModelAdmin
+):
     inlines = (GenreFilmWorkInline, PersonFilmWorkInline)
-    search_fields = ("title", "type", "rating")
-    list_display = ("title", "type", "description", "rating", "get_genres")
-    list_prefetch_related = ("genres",)
+    # walks film_work_type_rating_idx
+    keyset_ordering = ("type", "rating_key", "id")
+    search_fields = ("title", "description")
+    list_display = (
+        "title", "type", "get_description", "rating", "get_genres"
+    )
+    list_filter = ("type", GenreListFilter)
+    sortable_by = ("get_genres",)
 
     def get_queryset(self, request):
-        queryset = (
+        # genre names come aggregated in the page query instead of a
+        # prefetch query and a model per genre
+        genre_names = (
+            GenreFilmWork.objects.filter(film_work=OuterRef("pk"))
+            .values("film_work")
+            .annotate(
+                names=StringAgg(
+                    "genre__name", delimiter=", ", ordering="genre__name"
+                )
+            )
+            .values("names")
+        )
+        return (
             super()
             .get_queryset(request)
-            .prefetch_related(*self.list_prefetch_related)
+            .annotate(
+                genre_names=Subquery(
+                    genre_names, output_field=TextField(null=True)
+                ),
+                # the key is never NULL, which lets keyset seek by row
+                rating_key=ExpressionWrapper(
+                    rating_sort_key(), output_field=FloatField()
+                ),
+            )
         )
-        return queryset
 
+    def get_changelist(self, request, **kwargs):
+        return FilmWorkChangeList
+
+    @admin.display(description=_("description"))
+    def get_description(self, obj):
+        return obj.description_preview
+
+    @admin.display(description=_("genres"), ordering="genre_names")
     def get_genres(self, obj):
-        return ", ".join([genre.name for genre in obj.genres.all()])
+        return obj.genre_names
 
-    get_genres.short_description = _("genres")
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = SearchQuery(
+            search_term, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        condition = (
+            Q(search_vector=query)
+            | Q(title__iregex=substring_pattern(search_term))
+            | Q(title__trigram_word_similar=search_term)
+            # type and rating match exactly, through film_work_type_rating_idx
+            | Q(type=search_term.lower())
+        )
+        try:
+            rating = float(search_term)
+        except ValueError:
+            rating = None
+        # unrated film works sort as infinity in the index
+        if rating is not None and math.isfinite(rating):
+            condition |= Q(Exact(rating_sort_key(), rating))
+        return queryset.filter(condition), False
 
 
 @admin.register(Genre)
-class GenreAdmin(admin.ModelAdmin):
+class GenreAdmin(EstimatedCountMixin, admin.ModelAdmin):
     _fields = ("name", "description")
+    # name's unique index keeps autocomplete pages in order
+    ordering = ("name",)
     search_fields = _fields
     list_display = _fields
 
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(
+    KeysetPaginationMixin, EstimatedCountMixin, admin.ModelAdmin
+):
     search_fields = ("full_name",)
+    # walks person_full_name_idx, also for autocomplete pages
+    ordering = ("full_name", "id")
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        queryset = queryset.filter(
+            Q(full_name__iregex=substring_pattern(search_term))
+            | Q(full_name__trigram_word_similar=search_term)
+        )
+        return queryset, False
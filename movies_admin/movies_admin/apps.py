@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.contrib.admin.apps import AdminConfig
 from django.utils.translation import gettext_lazy as _
 
 
@@ -6,3 +7,10 @@ class MoviesAdminConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "movies_admin"
     verbose_name = _("movies_admin")
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+
+class MoviesAdminSiteConfig(AdminConfig):
+    default_site = "movies_admin.sites.MoviesAdminSite"
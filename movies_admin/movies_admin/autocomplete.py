@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+
+
+def version_key(model):
+    return f"autocomplete_version:{model._meta.label_lower}"
+
+
+def get_version(model):
+    return cache.get_or_set(version_key(model), time.time_ns, None)
+
+
+def bump_version(model):
+    # entries under the old version are never read again and age out
+    cache.set(version_key(model), time.time_ns(), None)
+
+
+class CachedAutocompleteJsonView(AutocompleteJsonView):
+    # the widget asks for the next page while "more" is true, no count needed
+    paginate_by = settings.AUTOCOMPLETE_LIMIT
+    cache_timeout = settings.AUTOCOMPLETE_CACHE_TIMEOUT
+
+    def get_page_number(self):
+        try:
+            return max(int(self.request.GET.get("page", 1)), 1)
+        except ValueError:
+            return 1
+
+    def cache_key(self, to_field_name, page):
+        model = self.source_field.remote_field.model
+        params = (
+            get_version(model),
+            self.source_field.model._meta.label_lower,
+            self.source_field.name,
+            to_field_name,
+            self.term,
+            page,
+        )
+        digest = hashlib.md5(repr(params).encode()).hexdigest()
+        return f"autocomplete:{model._meta.label_lower}:{digest}"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # a stable order keeps the bounded pages from overlapping
+        return queryset if queryset.ordered else queryset.order_by("pk")
+
+    def get(self, request, *args, **kwargs):
+        (
+            self.term,
+            self.model_admin,
+            self.source_field,
+            to_field_name,
+        ) = self.process_request(request)
+
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        page = self.get_page_number()
+        key = self.cache_key(to_field_name, page)
+        data = cache.get(key)
+        if data is None:
+            offset = (page - 1) * self.paginate_by
+            # one extra row tells whether there is a next page
+            objects = list(
+                self.get_queryset()[offset: offset + self.paginate_by + 1]
+            )
+            data = {
+                "results": [
+                    self.serialize_result(obj, to_field_name)
+                    for obj in objects[: self.paginate_by]
+                ],
+                "pagination": {"more": len(objects) > self.paginate_by},
+            }
+            cache.set(key, data, self.cache_timeout)
+        return JsonResponse(data)
@@ -0,0 +1,248 @@
+import base64
+import binascii
+import json
+
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import (
+    GreaterThan,
+    GreaterThanOrEqual,
+    LessThan,
+    LessThanOrEqual,
+)
+
+CURSOR_VAR = "cursor"
+
+# matches nothing, for seeking past NULL which sorts last
+NOTHING = Q(pk__in=[])
+
+
+def parse_ordering(ordering):
+    return [
+        (field.removeprefix("-"), field.startswith("-")) for field in ordering
+    ]
+
+
+def reverse_ordering(ordering):
+    return [
+        field if descending else f"-{field}"
+        for field, descending in parse_ordering(ordering)
+    ]
+
+
+def encode_cursor(values, backwards=False):
+    data = json.dumps([values, backwards], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values, backwards = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError(f"Malformed cursor '{cursor}'")
+    return values, bool(backwards)
+
+
+def _after(field, value, nullable):
+    # Postgres puts NULL last ascending and first descending, i.e. NULL
+    # compares greater than any value in both directions
+    if value is None:
+        return NOTHING
+    condition = Q(**{f"{field}__gt": value})
+    if nullable:
+        condition |= Q(**{f"{field}__isnull": True})
+    return condition
+
+
+def _before(field, value, nullable):
+    if value is None:
+        return Q(**{f"{field}__isnull": False})
+    return Q(**{f"{field}__lt": value})
+
+
+def _equal(field, value):
+    if value is None:
+        return Q(**{f"{field}__isnull": True})
+    return Q(**{field: value})
+
+
+class Row(Func):
+    function = "ROW"
+    output_field = Field()
+
+
+def get_output_field(queryset, field):
+    if field == "pk":
+        return queryset.model._meta.pk
+    # annotations declare whether they can be NULL on their output field
+    if field in queryset.query.annotations:
+        return queryset.query.annotations[field].output_field
+    return queryset.model._meta.get_field(field)
+
+
+def coerce_cursor(queryset, ordering, values):
+    # the cursor comes from the URL, its values reach the ORM as typed here
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError("The cursor doesn't match the ordering")
+    try:
+        return [
+            None if value is None
+            else get_output_field(queryset, field).to_python(value)
+            for (field, _), value in zip(parse_ordering(ordering), values)
+        ]
+    except ValidationError as error:
+        raise ValueError(f"Invalid cursor values {values!r}") from error
+
+
+def _row_comparison(queryset, fields, values, before, inclusive):
+    if before:
+        lookup = LessThanOrEqual if inclusive else LessThan
+    else:
+        lookup = GreaterThanOrEqual if inclusive else GreaterThan
+    lhs = [F(field) for field in fields]
+    rhs = [
+        Value(value, output_field=get_output_field(queryset, field))
+        for field, value in zip(fields, values)
+    ]
+    if len(fields) == 1:
+        return Q(lookup(lhs[0], rhs[0]))
+    return Q(lookup(Row(*lhs), Row(*rhs)))
+
+
+def keyset_filter(queryset, ordering, values, backwards=False):
+    # rows strictly past values in the given ordering: equal on a prefix of
+    # the fields and past on the next one
+    ordering = parse_ordering(ordering)
+    condition = NOTHING
+    prefix = Q()
+    for (field, descending), value in zip(ordering, values):
+        seek = _before if descending != backwards else _after
+        nullable = get_output_field(queryset, field).null
+        condition |= prefix & seek(field, value, nullable)
+        prefix &= _equal(field, value)
+
+    # an OR chain can't start an index range, so the leading non-null
+    # fields seeking the same way are bounded by one row comparison
+    bound_fields, bound_values, bound_before = [], [], None
+    for (field, descending), value in zip(ordering, values):
+        before = descending != backwards
+        if (
+                value is None
+                or get_output_field(queryset, field).null
+                or bound_before not in (None, before)
+        ):
+            break
+        bound_fields.append(field)
+        bound_values.append(value)
+        bound_before = before
+    if not bound_fields:
+        return condition
+    if len(bound_fields) == len(ordering):
+        # the comparison covers the whole key and replaces the chain
+        return _row_comparison(
+            queryset, bound_fields, bound_values, bound_before, False
+        )
+    return condition & _row_comparison(
+        queryset, bound_fields, bound_values, bound_before, True
+    )
+
+
+def keyset_values(obj, ordering):
+    return [getattr(obj, field) for field, _ in parse_ordering(ordering)]
+
+
+class KeysetChangeList(ChangeList):
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # filters and searches start over from the first page
+        if not new_params or CURSOR_VAR not in new_params:
+            remove = [*(remove or ()), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_ordering(self, request, queryset):
+        # a column picked in the header is followed by the primary key
+        if ORDER_VAR in self.params:
+            return super().get_ordering(request, queryset)
+        return list(self.model_admin.get_keyset_ordering(request))
+
+    def get_results(self, request):
+        ordering = list(self.queryset.query.order_by)
+        cursor = request.GET.get(CURSOR_VAR)
+        values, backwards = None, False
+        if cursor:
+            try:
+                values, backwards = decode_cursor(cursor)
+                values = coerce_cursor(self.queryset, ordering, values)
+            except ValueError:
+                # a stale or tampered cursor starts over from the first page
+                values, backwards = None, False
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(
+                keyset_filter(queryset, ordering, values, backwards)
+            )
+        if backwards:
+            queryset = queryset.order_by(*reverse_ordering(ordering))
+        # one extra row tells whether there is a page past this one
+        result_list = list(queryset[: self.list_per_page + 1])
+        has_more = len(result_list) > self.list_per_page
+        del result_list[self.list_per_page:]
+        if backwards:
+            result_list.reverse()
+
+        has_next = has_more if not backwards else values is not None
+        has_prev = has_more if backwards else values is not None
+        self.next_cursor = self.prev_cursor = None
+        if result_list and has_next:
+            self.next_cursor = encode_cursor(
+                keyset_values(result_list[-1], ordering)
+            )
+        if result_list and has_prev:
+            self.prev_cursor = encode_cursor(
+                keyset_values(result_list[0], ordering), backwards=True
+            )
+
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.next_cursor or self.prev_cursor)
+        self.paginator = paginator
+
+    @property
+    def next_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    @property
+    def prev_url(self):
+        return self.get_query_string({CURSOR_VAR: self.prev_cursor})
+
+
+class KeysetPaginationMixin:
+    # the fields must be indexed and the last one unique, falls back to
+    # the admin's ordering
+    keyset_ordering = None
+    change_list_template = "admin/keyset_change_list.html"
+    # columns listed here are sortable, seeking by their values without an
+    # index behind them
+    sortable_by = ()
+    # list_editable formsets need result_list to be a queryset
+    list_editable = ()
+
+    def get_keyset_ordering(self, request):
+        return self.keyset_ordering or self.get_ordering(request) or ("pk",)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,27 @@
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies_admin", "0003_person_full_name_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="filmwork",
+            name="film_work_type_rating_idx",
+        ),
+        migrations.AddIndex(
+            model_name="filmwork",
+            index=models.Index(
+                models.F("type"),
+                django.db.models.functions.comparison.Coalesce(
+                    "rating", models.Value(float("inf"))
+                ),
+                models.F("id"),
+                name="film_work_type_rating_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,11 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 
@@ -17,6 +21,12 @@ class Role(models.TextChoices):
     WRITER = ("writer", _("writer"))
 
 
+def rating_sort_key():
+    # NULL last like Postgres sorts it, but never NULL itself, so a row
+    # comparison over (type, rating, id) can seek along the index
+    return Coalesce("rating", Value(float("inf")))
+
+
 class UUIDMixin(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -52,6 +62,16 @@ class Person(UUIDMixin, TimeStampedMixin):
         db_table = 'content"."person'
         verbose_name = _("person")
         verbose_name_plural = _("people")
+        indexes = [
+            models.Index(
+                fields=["full_name", "id"], name="person_full_name_idx"
+            ),
+            GinIndex(
+                fields=["full_name"],
+                name="person_full_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -70,6 +90,8 @@ class FilmWork(UUIDMixin, TimeStampedMixin):
     type = models.TextField(_("type"), choices=FilmWorkType.choices)
     genres = models.ManyToManyField(Genre, through="GenreFilmWork")
     people = models.ManyToManyField(Person, through="PersonFilmWork")
+    # filled by the film_work_search_vector_update trigger
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'content"."film_work'
@@ -77,7 +99,18 @@ class FilmWork(UUIDMixin, TimeStampedMixin):
         verbose_name_plural = _("film_works")
         indexes = [
             models.Index(
-                fields=["type", "rating"], name="film_work_type_rating_idx"
+                F("type"),
+                rating_sort_key(),
+                F("id"),
+                name="film_work_type_rating_idx",
+            ),
+            GinIndex(
+                fields=["search_vector"], name="film_work_search_vector_idx"
+            ),
+            GinIndex(
+                fields=["title"],
+                name="film_work_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
             ),
         ]
         constraints = [
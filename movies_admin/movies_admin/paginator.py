@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def table_estimate(queryset):
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+def plan_estimate(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+def estimate_count(queryset):
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        return table_estimate(queryset)
+    return plan_estimate(queryset)
+
+
+class EstimatedCountPaginator(Paginator):
+    # exact counts below the threshold, the planner's estimate above it
+    threshold = settings.ADMIN_COUNT_ESTIMATE_THRESHOLD
+    cache_timeout = settings.ADMIN_COUNT_CACHE_TIMEOUT
+
+    def cache_key(self):
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.md5(
+            repr((self.object_list.db, sql, params)).encode()
+        ).hexdigest()
+        return f"admin_count:{digest}"
+
+    def get_count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= self.threshold:
+            return estimate
+        return super().count
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        key = self.cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = self.get_count()
+            cache.set(key, count, self.cache_timeout)
+        return count
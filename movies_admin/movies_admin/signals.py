@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+
+from .autocomplete import bump_version
+from .models import Genre, Person
+
+
+def invalidate_autocomplete(sender, **kwargs):
+    bump_version(sender)
+
+
+for model in (Genre, Person):
+    for signal in (post_save, post_delete):
+        signal.connect(
+            invalidate_autocomplete,
+            sender=model,
+            dispatch_uid=f"invalidate_autocomplete_{model._meta.model_name}",
+        )
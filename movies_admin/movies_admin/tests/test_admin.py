@@ -0,0 +1,84 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from movies_admin.models import FilmWork, Genre
+
+
+def _search(search_term):
+    model_admin = admin.site._registry[FilmWork]
+    request = RequestFactory().get("/")
+    queryset, _ = model_admin.get_search_results(
+        request, model_admin.get_queryset(request), search_term
+    )
+    return queryset
+
+
+def _where(queryset):
+    return str(queryset.query).rsplit(" WHERE ", 1)[1]
+
+
+def test_search_matches_type_exactly():
+    where = _where(_search("Movie"))
+
+    assert '"content"."film_work"."type" = movie' in where
+    assert '"rating"' not in where
+
+
+def test_numeric_search_returns_film_works_rated_so(db):
+    rated = FilmWork.objects.create(title="Rated", type="movie", rating=8.5)
+    FilmWork.objects.create(title="Other", type="movie", rating=7.0)
+    FilmWork.objects.create(title="Unrated", type="tv_series")
+
+    assert list(_search("8.5").values_list("pk", flat=True)) == [rated.pk]
+
+
+def test_numeric_search_walks_the_type_rating_index(db):
+    FilmWork.objects.create(title="Rated", type="movie", rating=8.5)
+    with connection.cursor() as cursor:
+        # the table is too small to be worth an index otherwise
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    assert "film_work_type_rating_idx" in _search("8.5").explain()
+
+
+def test_infinite_terms_dont_match_unrated_film_works(db):
+    FilmWork.objects.create(title="Unrated", type="tv_series")
+
+    assert not _search("inf").exists()
+
+
+def _changelist_queries(user):
+    request = RequestFactory().get("/admin/movies_admin/filmwork/")
+    request.user = user
+    # the count would come from the cache the second time
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = admin.site._registry[FilmWork].changelist_view(request)
+        response.render()
+    return response, len(queries)
+
+
+def test_changelist_aggregates_genre_names_in_the_page_query(db):
+    user = User.objects.create_superuser("admin", password="admin")
+    comedy, drama = Genre.objects.bulk_create(
+        [Genre(name="Comedy"), Genre(name="Drama")]
+    )
+    film_work = FilmWork.objects.create(title="Both", type="movie")
+    film_work.genres.add(drama, comedy)
+    FilmWork.objects.create(title="None", type="movie")
+
+    response, queries = _changelist_queries(user)
+    genre_names = {
+        obj.title: obj.genre_names
+        for obj in response.context_data["cl"].result_list
+    }
+    assert genre_names == {"Both": "Comedy, Drama", "None": None}
+
+    # more rows and genres on the page, no more queries
+    FilmWork.objects.create(title="Comedy", type="movie").genres.add(comedy)
+    FilmWork.objects.create(title="Drama", type="movie").genres.add(drama)
+    assert _changelist_queries(user)[1] == queries
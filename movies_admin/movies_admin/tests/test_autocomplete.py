@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from movies_admin.autocomplete import CachedAutocompleteJsonView, get_version
+from movies_admin.models import Genre
+
+
+@pytest.fixture
+def user(db, monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(CachedAutocompleteJsonView, "paginate_by", 2)
+    Genre.objects.bulk_create(
+        Genre(name=name) for name in ("Comedy", "Drama", "Horror")
+    )
+    yield User.objects.create_superuser("admin", password="admin")
+    cache.clear()
+
+
+def _autocomplete(user, page=1, term=""):
+    request = RequestFactory().get(
+        "/admin/autocomplete/",
+        {
+            "app_label": "movies_admin",
+            "model_name": "genrefilmwork",
+            "field_name": "genre",
+            "term": term,
+            "page": page,
+        },
+    )
+    request.user = user
+    response = admin.site.autocomplete_view(request)
+    data = json.loads(response.content)
+    names = [result["text"] for result in data["results"]]
+    return names, data["pagination"]["more"]
+
+
+def test_pages_stop_when_no_extra_row_is_left(user):
+    assert _autocomplete(user) == (["Comedy", "Drama"], True)
+    assert _autocomplete(user, page=2) == (["Horror"], False)
+    assert _autocomplete(user, term="dr") == (["Drama"], False)
+
+
+def test_pages_are_served_from_the_cache(user):
+    _autocomplete(user)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert _autocomplete(user) == (["Comedy", "Drama"], True)
+    assert not queries.captured_queries
+
+
+def test_saving_a_genre_invalidates_the_cached_pages(user):
+    version = get_version(Genre)
+    _autocomplete(user)
+
+    Genre.objects.create(name="Action")
+
+    assert get_version(Genre) != version
+    assert _autocomplete(user) == (["Action", "Comedy"], True)
+
+
+def test_deleting_a_genre_invalidates_the_cached_pages(user):
+    version = get_version(Genre)
+    _autocomplete(user, page=2)
+
+    Genre.objects.get(name="Comedy").delete()
+
+    assert get_version(Genre) != version
+    assert _autocomplete(user, page=2) == ([], False)
@@ -0,0 +1,122 @@
+import uuid
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+
+from movies_admin.keyset import (
+    CURSOR_VAR,
+    NOTHING,
+    _after,
+    _before,
+    coerce_cursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+from movies_admin.models import FilmWork, Person
+
+FILM_ID = "a029c5df-ed43-465b-a384-9e32dc4f4cf2"
+
+
+def _where(queryset, ordering, values, backwards=False):
+    query = queryset.filter(
+        keyset_filter(queryset, ordering, values, backwards)
+    ).query
+    return str(query).rsplit(" WHERE ", 1)[1]
+
+
+def _film_works():
+    request = RequestFactory().get("/")
+    return admin.site._registry[FilmWork].get_queryset(request)
+
+
+def test_null_sorts_after_every_value():
+    assert _after("rating", None, nullable=True) == NOTHING
+    assert _before("rating", None, nullable=True).children == [
+        ("rating__isnull", False)
+    ]
+    assert ("rating__isnull", True) in _after(
+        "rating", 5.0, nullable=True
+    ).children
+    assert ("type__isnull", True) not in _after(
+        "type", "movie", nullable=False
+    ).children
+
+
+def test_non_null_key_seeks_with_one_row_comparison():
+    where = _where(Person.objects.all(), ("full_name", "id"), ["Bob", FILM_ID])
+
+    assert where.startswith(
+        'ROW("content"."person"."full_name", "content"."person"."id") > '
+    )
+    assert " OR " not in where
+
+    where = _where(
+        Person.objects.all(), ("full_name", "id"), ["Bob", FILM_ID], True
+    )
+    assert ") < (ROW(" in where
+
+
+def test_rating_key_keeps_film_work_seek_on_the_index():
+    where = _where(
+        _film_works(),
+        ("type", "rating_key", "id"),
+        ["movie", float("inf"), FILM_ID],
+    )
+
+    assert where.startswith('ROW("content"."film_work"."type", COALESCE(')
+    assert " OR " not in where
+
+
+def test_mixed_directions_bound_the_leading_field():
+    where = _where(_film_works(), ("title", "-pk"), ["Alien", FILM_ID])
+
+    assert '"content"."film_work"."title" > Alien' in where
+    assert where.endswith('AND "content"."film_work"."title" >= (Alien))')
+
+
+def test_nullable_leading_field_is_not_bounded():
+    where = _where(_film_works(), ("-genre_names", "-pk"), [None, FILM_ID])
+
+    assert "ROW(" not in where
+    assert ">=" not in where
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["movie", float("inf"), FILM_ID], backwards=True)
+
+    assert decode_cursor(cursor) == (["movie", float("inf"), FILM_ID], True)
+
+
+def test_cursor_values_are_coerced_to_the_key_fields():
+    ordering = ("type", "rating_key", "id")
+
+    assert coerce_cursor(_film_works(), ordering, ["movie", 8, FILM_ID]) == [
+        "movie", 8.0, uuid.UUID(FILM_ID)
+    ]
+    for values in (
+        ["movie", "high", FILM_ID],
+        ["movie", 8.0, "film"],
+        ["movie", 8.0],
+        {"type": "movie"},
+    ):
+        with pytest.raises(ValueError):
+            coerce_cursor(_film_works(), ordering, values)
+
+
+def test_invalid_cursors_start_from_the_first_page(db):
+    FilmWork.objects.create(title="Alien", type="movie", rating=8.5)
+    request = RequestFactory().get(
+        "/",
+        {CURSOR_VAR: encode_cursor(["movie", "high", FILM_ID])},
+    )
+    request.user = User.objects.create_superuser("admin", password="admin")
+
+    changelist = admin.site._registry[FilmWork].get_changelist_instance(
+        request
+    )
+
+    assert [obj.title for obj in changelist.result_list] == ["Alien"]
+    assert changelist.prev_cursor is None
@@ -0,0 +1,57 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from movies_admin.models import Genre
+from movies_admin.paginator import EstimatedCountPaginator
+
+
+@pytest.fixture
+def genres(db):
+    cache.clear()
+    Genre.objects.bulk_create(
+        Genre(name=name) for name in ("Comedy", "Drama", "Horror")
+    )
+    with connection.cursor() as cursor:
+        # reltuples and the planner's row counts come from the statistics
+        cursor.execute('ANALYZE "content"."genre"')
+    yield
+    cache.clear()
+
+
+def _count(queryset, threshold):
+    paginator = EstimatedCountPaginator(queryset.order_by("pk"), 10)
+    paginator.threshold = threshold
+    return paginator.count
+
+
+def test_small_counts_are_exact(genres):
+    Genre.objects.filter(name="Horror").delete()
+
+    assert _count(Genre.objects.all(), threshold=100) == 2
+
+
+def test_large_tables_use_the_table_estimate(genres):
+    # the statistics still hold the deleted row
+    Genre.objects.filter(name="Horror").delete()
+
+    assert _count(Genre.objects.all(), threshold=1) == 3
+
+
+def test_filtered_querysets_use_the_plan_estimate(genres):
+    Genre.objects.filter(name="Horror").delete()
+
+    assert _count(Genre.objects.filter(name="Horror"), threshold=1) == 1
+    cache.clear()
+    assert _count(Genre.objects.filter(name="Horror"), threshold=100) == 0
+
+
+def test_counts_are_cached_per_query(genres):
+    assert _count(Genre.objects.all(), threshold=100) == 3
+    Genre.objects.filter(name="Horror").delete()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert _count(Genre.objects.all(), threshold=100) == 3
+    assert not queries.captured_queries
+    assert _count(Genre.objects.exclude(name="Drama"), threshold=100) == 1
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from dataclasses import replace
+from typing import AsyncIterator, Iterator
+
+from psycopg_pool import AsyncConnectionPool
+
+from sqlite_to_postgres.async_postgres_saver import AsyncPostgresSaver
+from sqlite_to_postgres.batching import AdaptiveBatcher
+from sqlite_to_postgres.checkpoints import Checkpoint, Watermark
+from sqlite_to_postgres.connections import (
+    async_pool,
+    postgres_connection,
+    set_pool_size,
+    sqlite_connection,
+)
+from sqlite_to_postgres.db_settings import (
+    ASYNC_CONNECTIONS,
+    PG_DSL,
+    TABLE_MAPPING,
+)
+from sqlite_to_postgres.metrics import EtlMetrics
+from sqlite_to_postgres.options import EtlOptions
+from sqlite_to_postgres.scheduler import get_table_dependencies
+from sqlite_to_postgres.schema import restore_pending_objects
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+from sqlite_to_postgres.state import State
+from sqlite_to_postgres.swap import RELOAD_SUFFIX, schema_context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def _iterate_in_thread(batches: Iterator[list]) -> AsyncIterator[list]:
+    # SQLite has no async driver, so batches are pulled off the event loop
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        yield batch
+
+
+async def migrate_table_async(
+        table_name: str,
+        pool: AsyncConnectionPool,
+        options: EtlOptions = EtlOptions(),
+        metrics: EtlMetrics | None = None,
+):
+    metrics = metrics or EtlMetrics()
+    state = State()
+    if options.incremental:
+        tracker = Watermark(state, table_name, options.source_key)
+    else:
+        tracker = Checkpoint(
+            state,
+            table_name,
+            resume=options.resume,
+            source=options.source_key,
+        )
+        async with pool.connection() as pg_conn:
+            await tracker.validate_async(pg_conn)
+        if tracker.done:
+            logger.info("Skipping already migrated '%s'", tracker.key)
+            return
+
+    with sqlite_connection(
+            options.sqlite_path,
+            read_only=True,
+            fast_read=options.fast_read,
+    ) as sqlite_conn:
+        sqlite_loader = SQLiteLoader(
+            sqlite_conn, raw_rows=options.fast_read
+        )
+        if options.incremental:
+            data = sqlite_loader.extract_changes(
+                table_name, tracker.column, tracker.value
+            )
+        else:
+            data = sqlite_loader.extract_data(
+                table_name, after_id=tracker.last_id
+            )
+        # asyncio.to_thread may pull each batch on another thread, so the
+        # stages nest on a stack of their own
+        stack = []
+        transformed_data = metrics.timed(
+            sqlite_loader.transform_data(
+                metrics.timed(data, table_name, "extract", stack),
+                TABLE_MAPPING[table_name],
+            ),
+            table_name,
+            "transform",
+            stack,
+        )
+        batches = AdaptiveBatcher(options.adaptive_batching).rebatch(
+            transformed_data
+        )
+
+        try:
+            async with pool.connection() as pg_conn:
+                postgres_saver = AsyncPostgresSaver(
+                    pg_conn,
+                    options.load_mode,
+                    upsert=options.incremental,
+                    metrics=metrics,
+                    table_suffix=RELOAD_SUFFIX if options.swap_tables else "",
+                )
+                await postgres_saver.load_data(
+                    _iterate_in_thread(batches),
+                    table_name,
+                    on_commit=tracker.save,
+                )
+        finally:
+            batches.close()
+            transformed_data.close()
+    if not options.incremental:
+        tracker.finish()
+
+
+async def run_etl_async(
+        options: EtlOptions = EtlOptions(),
+        connections_count: int = ASYNC_CONNECTIONS,
+) -> EtlMetrics:
+    options = options.expand_shards()
+    set_pool_size(options.pool_size)
+    if options.swap_tables:
+        options = replace(options, resume=False)
+    metrics = EtlMetrics()
+    # whatever this run's mode, foreign keys and indexes a crashed deferred
+    # run dropped come back first: the schedule is read from the foreign
+    # keys and swaps copy the live tables' definitions
+    restore_pending_objects(options.workers)
+    with postgres_connection(PG_DSL) as pg_conn:
+        dependencies = get_table_dependencies(pg_conn, TABLE_MAPPING)
+
+    pool = async_pool(PG_DSL, connections_count)
+    await pool.open(wait=True)
+
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def migrate(table_name: str):
+        await asyncio.gather(
+            *(tasks[parent] for parent in dependencies[table_name])
+        )
+        logger.info("Starting migration of the table '%s'", table_name)
+        # shards share the connection pool, one loader per shard
+        await asyncio.gather(
+            *(
+                migrate_table_async(
+                    table_name,
+                    pool,
+                    replace(options, sqlite_path=sqlite_path),
+                    metrics,
+                )
+                for sqlite_path in options.source_paths
+            )
+        )
+        logger.info("Finished migration of the table '%s'", table_name)
+
+    try:
+        with schema_context(options):
+            async with asyncio.TaskGroup() as group:
+                for table_name in dependencies:
+                    tasks[table_name] = group.create_task(
+                        migrate(table_name)
+                    )
+        if not options.incremental:
+            Checkpoint.clear_all(State())
+    finally:
+        await pool.close()
+        logger.info("ETL metrics:\n%s", metrics.summary())
+        metrics.export()
+    return metrics
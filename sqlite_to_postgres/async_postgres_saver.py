@@ -0,0 +1,148 @@
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+import psycopg
+from psycopg.errors import UndefinedTable
+from psycopg.rows import tuple_row
+
+from sqlite_to_postgres.columnar import (
+    COPY_HEADER,
+    COPY_TRAILER,
+    encode_copy_batch,
+    get_encoders,
+)
+from sqlite_to_postgres.copy_rows import (
+    convert_row,
+    get_column_types,
+    get_column_types_query,
+    get_converters,
+)
+from sqlite_to_postgres.db_settings import LOAD_MODE, LOAD_MODES, LOAD_RETRIES
+from sqlite_to_postgres.load_plan import LoadPlan, get_load_plan
+from sqlite_to_postgres.metrics import EtlMetrics
+from sqlite_to_postgres.retries import RETRYABLE_ERRORS, handle_retryable_error
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncPostgresSaver:
+    def __init__(
+            self,
+            connection: psycopg.AsyncConnection,
+            load_mode: str = LOAD_MODE,
+            upsert: bool = False,
+            metrics: EtlMetrics | None = None,
+            retries: int = LOAD_RETRIES,
+            table_suffix: str = "",
+    ):
+        if load_mode not in LOAD_MODES:
+            raise ValueError(
+                f"Unknown load mode '{load_mode}', expected one of {LOAD_MODES}"
+            )
+        self.connection = connection
+        self.load_mode = load_mode
+        self.upsert = upsert
+        self.metrics = metrics or EtlMetrics(metrics_file=None)
+        self.retries = retries
+        self.table_suffix = table_suffix
+
+    def target_table(self, table_name: str) -> str:
+        return f"{table_name}{self.table_suffix}"
+
+    async def _get_column_types(
+            self, plan: LoadPlan
+    ) -> list[tuple[int, str]]:
+        async with self.connection.cursor(row_factory=tuple_row) as cursor:
+            await cursor.execute(*get_column_types_query(plan))
+            return get_column_types(await cursor.fetchall(), plan)
+
+    def _prepare_insert(
+            self, pg_cursor: psycopg.AsyncCursor, plan: LoadPlan
+    ) -> Callable[[list[tuple]], Awaitable[None]]:
+        insert_query = plan.get_insert_query(self.upsert)
+
+        async def write_batch(batch: list[tuple]):
+            # pipeline mode sends the batch's statements without waiting for
+            # a round trip per row
+            async with self.connection.pipeline():
+                await pg_cursor.executemany(insert_query, batch)
+
+        return write_batch
+
+    async def _prepare_copy(
+            self, pg_cursor: psycopg.AsyncCursor, plan: LoadPlan
+    ) -> Callable[[list[tuple]], Awaitable[None]]:
+        await pg_cursor.execute(plan.staging_query)
+        await self.connection.commit()
+
+        column_types = await self._get_column_types(plan)
+        type_oids = [oid for oid, _ in column_types]
+        converters = get_converters(column_types)
+        encoders = None
+        if self.load_mode == "columnar":
+            encoders = get_encoders(
+                [type_name for _, type_name in column_types]
+            )
+        merge_query = plan.get_merge_query(self.upsert)
+
+        async def write_batch(batch: list[tuple]):
+            async with pg_cursor.copy(plan.copy_query) as copy:
+                if encoders:
+                    await copy.write(COPY_HEADER)
+                    await copy.write(encode_copy_batch(batch, encoders))
+                    await copy.write(COPY_TRAILER)
+                else:
+                    copy.set_types(type_oids)
+                    for row in batch:
+                        await copy.write_row(convert_row(row, converters))
+            await pg_cursor.execute(merge_query)
+
+        return write_batch
+
+    async def _save_batch(
+            self,
+            batch: list[tuple],
+            table_name: str,
+            write_batch: Callable[[list[tuple]], Awaitable[None]],
+    ):
+        for attempt in range(self.retries + 1):
+            try:
+                started = time.perf_counter()
+                await write_batch(batch)
+                written = time.perf_counter()
+                await self.connection.commit()
+                committed = time.perf_counter()
+                break
+            except RETRYABLE_ERRORS as error:
+                await self.connection.rollback()
+                handle_retryable_error(
+                    error, table_name, attempt, self.retries, self.metrics
+                )
+        self.metrics.record_batch(
+            table_name, batch, written - started, committed - written
+        )
+
+    async def load_data(
+            self,
+            transformed_data: AsyncIterator[list[tuple]],
+            table_name: str,
+            on_commit: Callable[[list[tuple]], None] | None = None,
+    ):
+        plan = get_load_plan(table_name, self.target_table(table_name))
+        pg_cursor = self.connection.cursor()
+        try:
+            if self.load_mode in ("copy", "columnar"):
+                write_batch = await self._prepare_copy(pg_cursor, plan)
+            else:
+                write_batch = self._prepare_insert(pg_cursor, plan)
+            async for batch in transformed_data:
+                await self._save_batch(batch, table_name, write_batch)
+                if on_commit:
+                    on_commit(batch)
+        except UndefinedTable:
+            logger.exception(f"The table '%s' doesn't exist in the DB", table_name)
+            await self.connection.rollback()
+        finally:
+            await pg_cursor.close()
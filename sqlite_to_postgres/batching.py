@@ -0,0 +1,92 @@
+import logging
+import time
+from typing import Generator, Iterable
+
+from sqlite_to_postgres.db_settings import (
+    ADAPTIVE_BATCHING,
+    BATCH_MAX_BYTES,
+    BATCH_SIZE,
+    BATCH_SIZE_MAX,
+    BATCH_SIZE_MIN,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SAMPLE_ROWS = 8
+_FIXED_VALUE_SIZE = 16
+
+
+def estimate_row_size(row: tuple) -> int:
+    return sum(
+        len(value) if isinstance(value, (str, bytes)) else _FIXED_VALUE_SIZE
+        for value in row
+    )
+
+
+class AdaptiveBatcher:
+    def __init__(
+            self,
+            adaptive: bool = ADAPTIVE_BATCHING,
+            batch_size: int = BATCH_SIZE,
+            min_size: int = BATCH_SIZE_MIN,
+            max_size: int = BATCH_SIZE_MAX,
+            max_bytes: int = BATCH_MAX_BYTES,
+            growth: float = 2.0,
+    ):
+        self.adaptive = adaptive
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.growth = growth
+        self.batch_size = batch_size
+        self.row_size = _FIXED_VALUE_SIZE
+        self._direction = 1
+        self._last_throughput = 0.0
+
+    def _sample_row_size(self, batch: list[tuple]):
+        sample = batch[:_SAMPLE_ROWS]
+        size = sum(map(estimate_row_size, sample)) / len(sample)
+        self.row_size = max(int(size), 1)
+
+    def _size_limit(self) -> int:
+        by_memory = max(self.max_bytes // self.row_size, 1)
+        return min(self.batch_size, by_memory)
+
+    def tune(self, rows: int, elapsed: float):
+        throughput = rows / elapsed if elapsed > 0 else float("inf")
+        # hill climbing: keep moving while throughput improves, turn back
+        # as soon as it drops
+        if throughput < self._last_throughput:
+            self._direction = -self._direction
+        self._last_throughput = throughput
+        factor = self.growth if self._direction > 0 else 1 / self.growth
+        self.batch_size = min(
+            max(int(self.batch_size * factor), self.min_size), self.max_size
+        )
+        logger.debug(
+            "%.0f rows/s with %s rows per batch, next batch size %s",
+            throughput, rows, self.batch_size,
+        )
+
+    def _emit(self, batch: list[tuple]) -> Generator[list[tuple], None, None]:
+        started = time.perf_counter()
+        yield batch
+        if self.adaptive:
+            self.tune(len(batch), time.perf_counter() - started)
+
+    def rebatch(
+            self, batches: Iterable[list[tuple]]
+    ) -> Generator[list[tuple], None, None]:
+        buffer = []
+        for batch in batches:
+            if not batch:
+                continue
+            self._sample_row_size(batch)
+            for row in batch:
+                buffer.append(row)
+                if len(buffer) >= self._size_limit():
+                    yield from self._emit(buffer)
+                    buffer = []
+        if buffer:
+            yield from self._emit(buffer)
@@ -0,0 +1,56 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+from sqlite_to_postgres.benchmarks.generate import generate
+from sqlite_to_postgres.connections import sqlite_connection
+from sqlite_to_postgres.db_settings import TABLE_MAPPING
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+
+
+def _extract_all(path: str, fast_read: bool) -> int:
+    rows = 0
+    with sqlite_connection(
+            path, read_only=True, fast_read=fast_read
+    ) as sqlite_conn:
+        loader = SQLiteLoader(sqlite_conn, raw_rows=fast_read)
+        for table_name, model in TABLE_MAPPING.items():
+            data = loader.extract_data(table_name)
+            for batch in loader.transform_data(data, model):
+                rows += len(batch)
+    return rows
+
+
+def _measure(path: str, fast_read: bool) -> tuple[float, int]:
+    started = time.perf_counter()
+    rows = _extract_all(path, fast_read)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    _extract_all(path, fast_read)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / rows * 1_000_000, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the default and the fast read-only extraction"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--data-dir", default="/tmp/etl_benchmark")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = os.path.join(args.data_dir, f"movies_{args.rows}.sqlite")
+    if not os.path.exists(path):
+        generate(path, args.rows)
+
+    for name, fast_read in (("default", False), ("fast read", True)):
+        per_row, peak = _measure(path, fast_read)
+        print(f"{name:>10}: {per_row:.2f} us/row, peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Iterator
+
+SCHEMA = (
+    "CREATE TABLE genre (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+    "description TEXT, created_at timestamp with time zone, "
+    "updated_at timestamp with time zone)",
+    "CREATE TABLE person (id TEXT PRIMARY KEY, full_name TEXT NOT NULL, "
+    "created_at timestamp with time zone, "
+    "updated_at timestamp with time zone)",
+    "CREATE TABLE film_work (id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+    "description TEXT, creation_date DATE, file_path TEXT, rating FLOAT, "
+    "type TEXT NOT NULL, created_at timestamp with time zone, "
+    "updated_at timestamp with time zone)",
+    "CREATE TABLE genre_film_work (id TEXT PRIMARY KEY, "
+    "film_work_id TEXT NOT NULL, genre_id TEXT NOT NULL, "
+    "created_at timestamp with time zone)",
+    "CREATE TABLE person_film_work (id TEXT PRIMARY KEY, "
+    "film_work_id TEXT NOT NULL, person_id TEXT NOT NULL, "
+    "role TEXT NOT NULL, created_at timestamp with time zone)",
+)
+
+ROLES = ("actor", "director", "producer", "writer")
+TYPES = ("movie", "tv_series")
+INSERT_CHUNK = 50_000
+
+
+def get_table_sizes(total_rows: int) -> dict[str, int]:
+    genres = max(min(total_rows // 1_000, 500), 5)
+    film_works = max(total_rows // 5, 1)
+    persons = max(total_rows // 5, 1)
+    person_film_works = total_rows * 2 // 5
+    genre_film_works = max(
+        total_rows - genres - film_works - persons - person_film_works, 0
+    )
+    return {
+        "genre": genres,
+        "person": persons,
+        "film_work": film_works,
+        "genre_film_work": min(genre_film_works, film_works * genres),
+        "person_film_work": min(
+            person_film_works, film_works * persons * len(ROLES)
+        ),
+    }
+
+
+def _timestamps(rnd: random.Random) -> tuple[str, str]:
+    created = datetime(2021, 1, 1, tzinfo=UTC) + timedelta(
+        seconds=rnd.randrange(100_000_000)
+    )
+    updated = created + timedelta(seconds=rnd.randrange(1_000_000))
+    return created.isoformat(sep=" "), updated.isoformat(sep=" ")
+
+
+def _uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def _uuids(rnd: random.Random, count: int) -> list[str]:
+    return [_uuid(rnd) for _ in range(count)]
+
+
+def _insert(conn: sqlite3.Connection, table: str, rows: Iterator[tuple]):
+    while chunk := list(itertools.islice(rows, INSERT_CHUNK)):
+        placeholders = ", ".join(["?"] * len(chunk[0]))
+        conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", chunk)
+
+
+def generate(path: str, total_rows: int, seed: int = 42) -> dict[str, int]:
+    sizes = get_table_sizes(total_rows)
+    rnd = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+    genre_ids = _uuids(rnd, sizes["genre"])
+    person_ids = _uuids(rnd, sizes["person"])
+    film_work_ids = _uuids(rnd, sizes["film_work"])
+
+    _insert(conn, "genre", (
+        (genre_id, f"Genre {i}", f"Description of genre {i}",
+         *_timestamps(rnd))
+        for i, genre_id in enumerate(genre_ids)
+    ))
+    _insert(conn, "person", (
+        (person_id, f"Person {i} {rnd.choice('ABCDEFGH')}.",
+         *_timestamps(rnd))
+        for i, person_id in enumerate(person_ids)
+    ))
+    _insert(conn, "film_work", (
+        (film_work_id, f"Film {i}", "Plot " * rnd.randrange(5, 100),
+         f"{rnd.randrange(1950, 2024)}-{rnd.randrange(1, 13):02}-01", None,
+         round(rnd.uniform(1, 10), 1), rnd.choice(TYPES), *_timestamps(rnd))
+        for i, film_work_id in enumerate(film_work_ids)
+    ))
+    films = len(film_work_ids)
+    _insert(conn, "genre_film_work", (
+        (_uuid(rnd),
+         film_work_ids[i % films], genre_ids[i // films],
+         _timestamps(rnd)[0])
+        for i in range(sizes["genre_film_work"])
+    ))
+    persons = len(person_ids)
+    _insert(conn, "person_film_work", (
+        (_uuid(rnd),
+         film_work_ids[i % films], person_ids[i // films % persons],
+         ROLES[i // (films * persons)], _timestamps(rnd)[0])
+        for i in range(sizes["person_film_work"])
+    ))
+    conn.commit()
+    conn.close()
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic movies SQLite database"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for table, rows in generate(args.path, args.rows, args.seed).items():
+        print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
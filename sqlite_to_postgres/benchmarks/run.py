@@ -0,0 +1,113 @@
+import argparse
+import os
+import resource
+import time
+
+BENCHMARK_DIR = os.getenv("ETL_BENCHMARK_DIR", "/tmp/etl_benchmark")
+
+# the ETL reads its settings on import, also in spawned loader processes,
+# so the benchmark keeps off the state, metrics and shards of real runs
+os.environ.update(
+    ETL_STATE_FILE=os.path.join(BENCHMARK_DIR, "etl_state.sqlite3"),
+    ETL_METRICS_FILE="",
+    ETL_SQLITE_SHARDS="",
+)
+if os.getenv("ETL_BENCHMARK_POSTGRES_NAME"):
+    os.environ["POSTGRES_NAME"] = os.environ["ETL_BENCHMARK_POSTGRES_NAME"]
+
+from sqlite_to_postgres.benchmarks.generate import generate  # noqa: E402
+from sqlite_to_postgres.connections import postgres_connection  # noqa: E402
+from sqlite_to_postgres.db_settings import (  # noqa: E402
+    LOAD_MODES,
+    PG_DSL,
+    PIPELINE_QUEUE_SIZE,
+    TABLE_MAPPING,
+)
+from sqlite_to_postgres.main import run_etl  # noqa: E402
+from sqlite_to_postgres.options import EtlOptions  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return usage / 1024
+
+
+def _truncate_target():
+    with postgres_connection(PG_DSL) as pg_conn:
+        pg_conn.execute(
+            "TRUNCATE "
+            + ", ".join(f"content.{table}" for table in TABLE_MAPPING)
+            + " CASCADE"
+        )
+        pg_conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SQLite to PostgreSQL ETL on synthetic data"
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument("--data-dir", default=BENCHMARK_DIR)
+    parser.add_argument("--load-mode", choices=LOAD_MODES, default="insert")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--fast-read", action="store_true")
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="confirm that every content table of the target database is "
+        "truncated before each run, ETL_BENCHMARK_POSTGRES_NAME points "
+        "the benchmark at a database of its own",
+    )
+    args = parser.parse_args()
+    if not args.truncate:
+        parser.error(
+            f"the benchmark truncates the content tables of the database "
+            f"'{PG_DSL['dbname']}', pass --truncate to go ahead"
+        )
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    for rows in args.rows:
+        path = os.path.join(args.data_dir, f"movies_{rows}.sqlite")
+        if not os.path.exists(path):
+            print(f"Generating {rows} rows into {path}")
+            generate(path, rows)
+
+        # every option is spelled out so the ETL_* settings of real runs
+        # don't change what is measured
+        options = EtlOptions(
+            sqlite_path=path,
+            load_mode=args.load_mode,
+            workers=args.workers,
+            partitions=1,
+            incremental=False,
+            resume=False,
+            pipeline=False,
+            queue_size=PIPELINE_QUEUE_SIZE,
+            adaptive_batching=False,
+            defer_schema=False,
+            swap_tables=False,
+            fast_read=args.fast_read,
+            shards=(),
+        )
+
+        _truncate_target()
+        print(f"\n== {rows} rows, load mode {options.load_mode} ==")
+        started = time.perf_counter()
+        metrics = run_etl(options)
+        total = time.perf_counter() - started
+        print(metrics.summary())
+        print(f"run_etl: {total:.2f} s, {rows / total:.0f} rows/s")
+        print(f"peak RSS: {_peak_rss_mib():.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
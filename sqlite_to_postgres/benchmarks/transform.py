@@ -0,0 +1,83 @@
+import argparse
+import sqlite3
+import time
+import tracemalloc
+import uuid
+from datetime import UTC, datetime
+
+from sqlite_to_postgres.db_settings import FILTER_OUT_COLUMNS
+from sqlite_to_postgres.models import FilmWork, get_columns
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+
+
+def _create_film_work(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE film_work (id TEXT PRIMARY KEY, title TEXT, "
+        "description TEXT, creation_date DATE, file_path TEXT, rating FLOAT, "
+        "type TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)"
+    )
+    now = datetime.now(UTC).isoformat(sep=" ")
+    conn.executemany(
+        "INSERT INTO film_work VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                str(uuid.uuid4()), f"Title {i}", "Description " * 10,
+                "2020-01-01", None, i % 100 / 10, "movie",
+                now, None if i % 2 else now,
+            )
+            for i in range(rows)
+        ),
+    )
+    return conn
+
+
+def _dataclass_path(batches):
+    columns = [
+        col for col in get_columns(FilmWork) if col not in FILTER_OUT_COLUMNS
+    ]
+    for batch in batches:
+        records = [FilmWork(**dict(row)) for row in batch]
+        yield [tuple(getattr(row, col) for col in columns) for row in records]
+
+
+def _tuple_path(batches):
+    return SQLiteLoader.transform_data(batches, FilmWork)
+
+
+def _measure(conn: sqlite3.Connection, transform) -> tuple[float, int]:
+    loader = SQLiteLoader(conn)
+    batches = list(loader.extract_data("film_work"))
+    rows = sum(len(batch) for batch in batches)
+
+    started = time.perf_counter()
+    for _ in transform(iter(batches)):
+        pass
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in transform(iter(batches)):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / rows * 1_000_000, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the per-row cost of the ETL transform paths"
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    conn = _create_film_work(args.rows)
+    for name, transform in (
+            ("dataclass", _dataclass_path),
+            ("tuple", _tuple_path),
+    ):
+        per_row, peak = _measure(conn, transform)
+        print(f"{name:>10}: {per_row:.2f} us/row, peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
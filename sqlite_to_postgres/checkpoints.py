@@ -0,0 +1,113 @@
+import logging
+
+import psycopg
+
+from sqlite_to_postgres.db_settings import TABLE_MAPPING
+from sqlite_to_postgres.load_plan import get_load_plan
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+from sqlite_to_postgres.state import State
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    KEY_PREFIX = "checkpoint:"
+
+    def __init__(
+            self,
+            state: State,
+            table_name: str,
+            rowid_range: tuple[int, int] | None = None,
+            resume: bool = True,
+            source: str | None = None,
+    ):
+        self.state = state
+        self.table_name = table_name
+        self.key = self.make_key(table_name, rowid_range, source)
+        self._id_index = get_load_plan(table_name).column_index("id")
+        value = state.get_state(self.key, {}) if resume else {}
+        self.done = bool(value.get("done"))
+        self.last_id = value.get("last_id")
+
+    @staticmethod
+    def make_key(
+            table_name: str,
+            rowid_range: tuple[int, int] | None = None,
+            source: str | None = None,
+    ) -> str:
+        key = f"{Checkpoint.KEY_PREFIX}{table_name}"
+        if rowid_range:
+            key += f":{rowid_range[0]}-{rowid_range[1]}"
+        if source:
+            key += f"@{source}"
+        return key
+
+    @property
+    def target_query(self) -> str:
+        return f"SELECT 1 FROM content.{self.table_name} WHERE id = %s"
+
+    def _discard(self):
+        # the target was truncated or emptied since the checkpoint
+        logger.warning(
+            "'%s' is no longer in the target, loading from the start",
+            self.key,
+        )
+        self.done = False
+        self.last_id = None
+
+    def validate(self, connection: psycopg.Connection):
+        if self.last_id and not connection.execute(
+                self.target_query, (self.last_id,)
+        ).fetchone():
+            self._discard()
+
+    async def validate_async(self, connection: psycopg.AsyncConnection):
+        if self.last_id:
+            cursor = await connection.execute(
+                self.target_query, (self.last_id,)
+            )
+            if not await cursor.fetchone():
+                self._discard()
+
+    def save(self, batch: list[tuple]):
+        self.last_id = str(batch[-1][self._id_index])
+        self.state.set_state(self.key, {"last_id": self.last_id})
+
+    def finish(self):
+        # the last id stays, resume checks it against the target
+        self.done = True
+        self.state.set_state(
+            self.key, {"done": True, "last_id": self.last_id}
+        )
+
+    @staticmethod
+    def clear_all(state: State):
+        # only once the whole run succeeded, a crash keeps every table's
+        # markers so the next run skips what already finished
+        state.delete_prefix(Checkpoint.KEY_PREFIX)
+
+
+class Watermark:
+    def __init__(
+            self, state: State, table_name: str, source: str | None = None
+    ):
+        self.state = state
+        self.key = f"watermark:{table_name}"
+        if source:
+            self.key += f"@{source}"
+        self.column = SQLiteLoader.get_watermark_column(
+            TABLE_MAPPING[table_name]
+        )
+        plan = get_load_plan(table_name)
+        self._id_index = plan.column_index("id")
+        self._column_index = plan.column_index(self.column)
+        self.value = state.get_state(self.key)
+
+    def save(self, batch: list[tuple]):
+        # rows without a source timestamp got a generated one, skip them
+        for row in reversed(batch):
+            if isinstance(value := row[self._column_index], str):
+                self.value = [value, str(row[self._id_index])]
+                self.state.set_state(self.key, self.value)
+                return
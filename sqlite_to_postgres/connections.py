@@ -0,0 +1,103 @@
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from sqlite_to_postgres.db_settings import (
+    POOL_MIN_SIZE,
+    POOL_SIZE,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+)
+
+# one pool per process and connection settings, shared by every loader;
+# spawned partition and shard processes build their own, so a run can open
+# up to processes x pool size connections
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_pool_size = POOL_SIZE
+
+
+def _sqlite_uri(db_path: str, query: str) -> str:
+    # percent-encoded, so ?, # and % in the path aren't read as URI syntax
+    return f"{Path(os.path.abspath(db_path)).as_uri()}?{query}"
+
+
+@contextmanager
+def sqlite_connection(
+        db_path: str, read_only: bool = False, fast_read: bool = False
+):
+    # pipelined runs hand the connection over to an extraction thread
+    if fast_read:
+        # immutable skips locking and change detection, so the source must
+        # not be written to while the ETL reads it
+        conn = sqlite3.connect(
+            _sqlite_uri(db_path, "mode=ro&immutable=1"),
+            uri=True,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        # a negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE // 1024}")
+    elif read_only:
+        conn = sqlite3.connect(
+            _sqlite_uri(db_path, "mode=ro"),
+            uri=True,
+            check_same_thread=False,
+        )
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def set_pool_size(size: int):
+    # pools opened before the run knew its size are resized in place
+    global _pool_size
+    with _pools_lock:
+        _pool_size = size
+        for pool in _pools.values():
+            pool.resize(min(POOL_MIN_SIZE, size), size)
+
+
+def get_pool(
+        dsl: dict, max_size: int | None = None, **kwargs
+) -> ConnectionPool:
+    key = tuple(sorted({**dsl, **kwargs}.items()))
+    with _pools_lock:
+        max_size = max_size or _pool_size
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                kwargs={**dsl, **kwargs},
+                min_size=min(POOL_MIN_SIZE, max_size),
+                max_size=max_size,
+                open=True,
+            )
+        return _pools[key]
+
+
+@atexit.register
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def postgres_connection(dsl: dict, **kwargs):
+    # the pool commits on a clean exit and rolls back on an error
+    with get_pool(dsl, **kwargs).connection() as conn:
+        yield conn
+
+
+def async_pool(dsl: dict, size: int) -> AsyncConnectionPool:
+    return AsyncConnectionPool(
+        kwargs=dsl, min_size=size, max_size=size, open=False
+    )
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from sqlite_to_postgres.load_plan import LoadPlan
+
+COLUMN_TYPES_QUERY = (
+    "SELECT attname, atttypid, format_type(atttypid, NULL) "
+    "FROM pg_attribute "
+    "WHERE attrelid = %s::regclass AND attnum > 0 "
+    "AND NOT attisdropped"
+)
+
+
+def _to_uuid(value):
+    return value if isinstance(value, UUID) else UUID(value)
+
+
+def _to_datetime(value):
+    return (
+        value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    )
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+COPY_CONVERTERS = {
+    "uuid": _to_uuid,
+    "timestamp with time zone": _to_datetime,
+    "date": _to_date,
+    "double precision": float,
+}
+
+
+def get_column_types_query(plan: LoadPlan) -> tuple[str, tuple[str]]:
+    return COLUMN_TYPES_QUERY, (f"content.{plan.table_name}",)
+
+
+def get_column_types(
+        rows: Iterable[tuple[str, int, str]], plan: LoadPlan
+) -> list[tuple[int, str]]:
+    # the (oid, type name) of the plan's target columns, in their order
+    types = {name: (oid, type_name) for name, oid, type_name in rows}
+    return [types[col] for col in plan.target_columns]
+
+
+def get_converters(
+        column_types: list[tuple[int, str]]
+) -> list[Callable[[Any], Any] | None]:
+    return [COPY_CONVERTERS.get(type_name) for _, type_name in column_types]
+
+
+def convert_row(
+        row: tuple, converters: list[Callable[[Any], Any] | None]
+) -> list:
+    # binary COPY needs the Python types matching the column types
+    return [
+        value if value is None or convert is None else convert(value)
+        for value, convert in zip(row, converters)
+    ]
@@ -23,7 +23,57 @@ PG_DSL = {
     "port": os.getenv("POSTGRES_PORT", 5432),
 }
 
-BATCH_SIZE = 100
+BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", 100))
+FETCH_SIZE = int(os.getenv("ETL_FETCH_SIZE", 1000))
+ADAPTIVE_BATCHING = os.getenv("ETL_ADAPTIVE_BATCHING", "false").lower() in (
+    "1", "true", "yes"
+)
+BATCH_SIZE_MIN = int(os.getenv("ETL_BATCH_SIZE_MIN", 100))
+BATCH_SIZE_MAX = int(os.getenv("ETL_BATCH_SIZE_MAX", 50_000))
+BATCH_MAX_BYTES = int(os.getenv("ETL_BATCH_MAX_BYTES", 64 * 1024 * 1024))
+
+# comma-separated paths or glob patterns of SQLite shards to merge
+SQLITE_SHARDS = os.getenv("ETL_SQLITE_SHARDS", "")
+SQLITE_FAST_READ = os.getenv("ETL_SQLITE_FAST_READ", "false").lower() in (
+    "1", "true", "yes"
+)
+SQLITE_MMAP_SIZE = int(os.getenv("ETL_SQLITE_MMAP_SIZE", 1024 * 1024 * 1024))
+SQLITE_CACHE_SIZE = int(os.getenv("ETL_SQLITE_CACHE_SIZE", 256 * 1024 * 1024))
+
+LOAD_MODES = ("insert", "copy", "columnar")
+LOAD_MODE = os.getenv("ETL_LOAD_MODE", "insert")
+
+ETL_WORKERS = int(os.getenv("ETL_WORKERS", os.cpu_count() or 1))
+# a floor, runs size their pools from their own worker count
+POOL_SIZE = int(os.getenv("ETL_POOL_SIZE", ETL_WORKERS))
+POOL_MIN_SIZE = int(os.getenv("ETL_POOL_MIN_SIZE", 1))
+ETL_PARTITIONS = int(os.getenv("ETL_PARTITIONS", 1))
+PARTITION_MIN_ROWS = int(os.getenv("ETL_PARTITION_MIN_ROWS", 100_000))
+ETL_INCREMENTAL = os.getenv("ETL_INCREMENTAL", "false").lower() in (
+    "1", "true", "yes"
+)
+ETL_PIPELINE = os.getenv("ETL_PIPELINE", "false").lower() in (
+    "1", "true", "yes"
+)
+PIPELINE_QUEUE_SIZE = int(os.getenv("ETL_PIPELINE_QUEUE_SIZE", 4))
+ASYNC_CONNECTIONS = int(os.getenv("ETL_ASYNC_CONNECTIONS", 4))
+ETL_DEFER_SCHEMA = os.getenv("ETL_DEFER_SCHEMA", "false").lower() in (
+    "1", "true", "yes"
+)
+ETL_SWAP_TABLES = os.getenv("ETL_SWAP_TABLES", "false").lower() in (
+    "1", "true", "yes"
+)
+ETL_RESUME = os.getenv("ETL_RESUME", "true").lower() in ("1", "true", "yes")
+LOAD_RETRIES = int(os.getenv("ETL_LOAD_RETRIES", 3))
+METRICS_FILE = os.getenv("ETL_METRICS_FILE")
+METRICS_FORMATS = ("jsonl", "prometheus")
+# defaults to prometheus for .prom files and JSON lines for any other file
+METRICS_FORMAT = os.getenv("ETL_METRICS_FORMAT")
+VERIFY_DIFF_ROWS = int(os.getenv("ETL_VERIFY_DIFF_ROWS", 1000))
+
+STATE_FILE_PATH = os.getenv(
+    "ETL_STATE_FILE", os.path.join(BASE_DIR, "etl_state.sqlite3")
+)
 
 TABLE_MAPPING = {
     "genre": Genre,
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from functools import cache
+
+from sqlite_to_postgres.db_settings import (
+    COLUMN_MAPPING,
+    FILTER_OUT_COLUMNS,
+    TABLE_MAPPING,
+)
+from sqlite_to_postgres.models import T, get_columns
+
+
+@dataclass(frozen=True, slots=True)
+class LoadPlan:
+    table_name: str
+    target_table: str
+    source_columns: tuple[str, ...]
+    target_columns: tuple[str, ...]
+    select_query: str
+    insert_query: str
+    upsert_query: str
+    conflict_clause: str
+    upsert_clause: str
+    # copy and columnar loads go through a temporary staging table
+    staging_table: str
+    staging_query: str
+    copy_query: str
+
+    def column_index(self, source_column: str) -> int:
+        return self.source_columns.index(source_column)
+
+    def get_insert_query(self, upsert: bool = False) -> str:
+        return self.upsert_query if upsert else self.insert_query
+
+    def get_merge_query(self, upsert: bool = False) -> str:
+        columns = ", ".join(self.target_columns)
+        return (
+            f"INSERT INTO content.{self.target_table} ({columns}) "
+            f"SELECT {columns} FROM {self.staging_table} "
+            f"{self.upsert_clause if upsert else self.conflict_clause}"
+        )
+
+
+@cache
+def get_source_columns(model: type[T]) -> tuple[str, ...]:
+    return tuple(
+        col for col in get_columns(model) if col not in FILTER_OUT_COLUMNS
+    )
+
+
+@cache
+def get_load_plan(
+        table_name: str, target_table: str | None = None
+) -> LoadPlan:
+    target_table = target_table or table_name
+    source_columns = get_source_columns(TABLE_MAPPING[table_name])
+    target_columns = tuple(
+        COLUMN_MAPPING.get(col, col) for col in source_columns
+    )
+    columns = ", ".join(target_columns)
+    placeholders = ", ".join(["%s"] * len(target_columns))
+    conflict_clause = "ON CONFLICT (id) DO NOTHING"
+    upsert_clause = "ON CONFLICT (id) DO UPDATE SET " + ", ".join(
+        f"{col} = EXCLUDED.{col}" for col in target_columns if col != "id"
+    )
+    insert = (
+        f"INSERT INTO content.{target_table} ({columns}) "
+        f"VALUES ({placeholders})"
+    )
+    staging_table = f"{table_name}_staging"
+    return LoadPlan(
+        table_name=table_name,
+        target_table=target_table,
+        source_columns=source_columns,
+        target_columns=target_columns,
+        select_query=f"SELECT {', '.join(source_columns)} FROM {table_name}",
+        insert_query=f"{insert} {conflict_clause}",
+        upsert_query=f"{insert} {upsert_clause}",
+        conflict_clause=conflict_clause,
+        upsert_clause=upsert_clause,
+        staging_table=staging_table,
+        staging_query=(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} "
+            f"(LIKE content.{table_name} INCLUDING DEFAULTS) "
+            f"ON COMMIT DELETE ROWS"
+        ),
+        copy_query=(
+            f"COPY {staging_table} ({columns}) FROM STDIN (FORMAT BINARY)"
+        ),
+    )
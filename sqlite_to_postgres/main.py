@@ -1,45 +1,291 @@
-import sqlite3
-from contextlib import contextmanager
+import argparse
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import replace
+from functools import partial
+from typing import Callable, Iterator
 
-import psycopg
 from psycopg import ClientCursor
 from psycopg.rows import dict_row
 
-from sqlite_to_postgres.db_settings import TABLE_MAPPING, PG_DSL, SQLITE_DB_PATH
+from sqlite_to_postgres.async_etl import run_etl_async
+from sqlite_to_postgres.batching import AdaptiveBatcher
+from sqlite_to_postgres.checkpoints import Checkpoint, Watermark
+from sqlite_to_postgres.connections import (
+    close_pools,
+    postgres_connection,
+    set_pool_size,
+    sqlite_connection,
+)
+from sqlite_to_postgres.db_settings import (
+    PARTITION_MIN_ROWS,
+    PG_DSL,
+    TABLE_MAPPING,
+)
+from sqlite_to_postgres.metrics import EtlMetrics
+from sqlite_to_postgres.options import EtlOptions
+from sqlite_to_postgres.pipeline import run_stage
 from sqlite_to_postgres.postgres_saver import PostgresSaver
+from sqlite_to_postgres.scheduler import get_table_dependencies, run_scheduled
+from sqlite_to_postgres.schema import restore_pending_objects
 from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+from sqlite_to_postgres.state import State
+from sqlite_to_postgres.swap import RELOAD_SUFFIX, schema_context
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-@contextmanager
-def sqlite_connection(db_path: str):
-    conn = sqlite3.connect(db_path)
+
+def _run_stages(
+        sqlite_loader: SQLiteLoader,
+        postgres_saver: PostgresSaver,
+        data: Iterator[list],
+        table_name: str,
+        options: EtlOptions,
+        metrics: EtlMetrics,
+        on_commit: Callable[[list[tuple]], None] | None = None,
+):
+    data = metrics.timed(data, table_name, "extract")
+    if options.pipeline:
+        data = run_stage(data, options.queue_size, f"{table_name}-extract")
+    transformed_data = metrics.timed(
+        sqlite_loader.transform_data(data, TABLE_MAPPING[table_name]),
+        table_name,
+        "transform",
+    )
+    if options.pipeline:
+        transformed_data = run_stage(
+            transformed_data, options.queue_size, f"{table_name}-transform"
+        )
+    batches = AdaptiveBatcher(options.adaptive_batching).rebatch(
+        transformed_data
+    )
     try:
-        yield conn
+        postgres_saver.load_data(batches, table_name, on_commit=on_commit)
     finally:
-        conn.close()
+        batches.close()
+        transformed_data.close()
 
 
-@contextmanager
-def postgres_connection(dsl: dict, **kwargs):
-    conn = psycopg.connect(**dsl, **kwargs)
-    try:
-        yield conn
-    finally:
-        conn.close()
+def migrate_table_range(
+        table_name: str,
+        rowid_range: tuple[int, int] | None = None,
+        options: EtlOptions = EtlOptions(),
+        metrics: EtlMetrics | None = None,
+) -> dict[str, dict]:
+    metrics = metrics or EtlMetrics()
+    checkpoint = Checkpoint(
+        State(), table_name, rowid_range, options.resume, options.source_key
+    )
+    with postgres_connection(PG_DSL) as pg_conn:
+        checkpoint.validate(pg_conn)
+    if checkpoint.done:
+        logger.info("Skipping already migrated '%s'", checkpoint.key)
+        return metrics.to_dict()
+    if checkpoint.last_id:
+        logger.info(
+            "Resuming '%s' after id %s", checkpoint.key, checkpoint.last_id
+        )
+
+    with sqlite_connection(
+            options.sqlite_path,
+            read_only=True,
+            fast_read=options.fast_read,
+    ) as sqlite_conn, postgres_connection(
+        PG_DSL, row_factory=dict_row, cursor_factory=ClientCursor
+    ) as pg_conn:
+        sqlite_loader = SQLiteLoader(
+            sqlite_conn, raw_rows=options.fast_read
+        )
+        postgres_saver = PostgresSaver(
+            pg_conn,
+            options.load_mode,
+            metrics=metrics,
+            table_suffix=RELOAD_SUFFIX if options.swap_tables else "",
+        )
+
+        data = sqlite_loader.extract_data(
+            table_name, rowid_range, checkpoint.last_id
+        )
+        _run_stages(
+            sqlite_loader,
+            postgres_saver,
+            data,
+            table_name,
+            options,
+            metrics,
+            on_commit=checkpoint.save,
+        )
+    checkpoint.finish()
+    return metrics.to_dict()
 
 
-def run_etl():
-    with sqlite_connection(SQLITE_DB_PATH) as sqlite_conn, postgres_connection(
-            PG_DSL, row_factory=dict_row, cursor_factory=ClientCursor
+def migrate_table_changes(
+        table_name: str,
+        options: EtlOptions = EtlOptions(),
+        metrics: EtlMetrics | None = None,
+) -> dict[str, dict]:
+    metrics = metrics or EtlMetrics()
+    watermark = Watermark(State(), table_name, options.source_key)
+
+    with sqlite_connection(
+            options.sqlite_path,
+            read_only=True,
+            fast_read=options.fast_read,
+    ) as sqlite_conn, postgres_connection(
+        PG_DSL, row_factory=dict_row, cursor_factory=ClientCursor
     ) as pg_conn:
-        sqlite_loader = SQLiteLoader(sqlite_conn)
-        postgres_saver = PostgresSaver(pg_conn)
+        sqlite_loader = SQLiteLoader(
+            sqlite_conn, raw_rows=options.fast_read
+        )
+        postgres_saver = PostgresSaver(
+            pg_conn, options.load_mode, upsert=True, metrics=metrics
+        )
+
+        data = sqlite_loader.extract_changes(
+            table_name, watermark.column, watermark.value
+        )
+        _run_stages(
+            sqlite_loader,
+            postgres_saver,
+            data,
+            table_name,
+            options,
+            metrics,
+            on_commit=watermark.save,
+        )
+    return metrics.to_dict()
+
+
+def _migrate_unit(
+        table_name: str,
+        unit: tuple[str, tuple[int, int] | None],
+        options: EtlOptions = EtlOptions(),
+        metrics: EtlMetrics | None = None,
+) -> dict[str, dict]:
+    sqlite_path, rowid_range = unit
+    options = replace(options, sqlite_path=sqlite_path)
+    if options.incremental:
+        return migrate_table_changes(table_name, options, metrics)
+    return migrate_table_range(table_name, rowid_range, options, metrics)
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn keeps the children clear of locks held by scheduler threads
+    return ProcessPoolExecutor(
+        max_workers=max(workers, 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def migrate_table(
+        table_name: str,
+        options: EtlOptions = EtlOptions(),
+        metrics: EtlMetrics | None = None,
+        executor: ProcessPoolExecutor | None = None,
+):
+    metrics = metrics or EtlMetrics()
+    units = []
+    for sqlite_path in options.source_paths:
+        rowid_ranges = [None]
+        if options.partitions > 1 and not options.incremental:
+            with sqlite_connection(
+                    sqlite_path,
+                    read_only=True,
+                    fast_read=options.fast_read,
+            ) as sqlite_conn:
+                rowid_ranges = SQLiteLoader(sqlite_conn).get_rowid_ranges(
+                    table_name, options.partitions, PARTITION_MIN_ROWS
+                ) or [None]
+        units.extend(
+            (sqlite_path, rowid_range) for rowid_range in rowid_ranges
+        )
+
+    if len(units) == 1 and not options.shards:
+        _migrate_unit(table_name, units[0], options, metrics)
+    else:
+        with ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(
+                    process_pool(min(len(units), options.workers))
+                )
+            for (sqlite_path, _), unit_metrics in zip(
+                    units,
+                    executor.map(
+                        partial(_migrate_unit, table_name, options=options),
+                        units,
+                    ),
+            ):
+                metrics.merge(unit_metrics)
+                if options.shards:
+                    metrics.record_source(sqlite_path, unit_metrics)
+                    logger.info(
+                        "Shard '%s' loaded %s rows of '%s', %.0f rows/s "
+                        "over the shard so far",
+                        sqlite_path,
+                        unit_metrics.get(table_name, {}).get("rows", 0),
+                        table_name,
+                        metrics.source_throughput(sqlite_path),
+                    )
+
+
+def run_etl(options: EtlOptions = EtlOptions()) -> EtlMetrics:
+    options = options.expand_shards()
+    set_pool_size(options.pool_size)
+    if options.swap_tables:
+        # the reload tables start empty, so no checkpoint can be resumed
+        options = replace(options, resume=False)
+    metrics = EtlMetrics()
+    # whatever this run's mode, foreign keys and indexes a crashed deferred
+    # run dropped come back first: the schedule is read from the foreign
+    # keys and swaps copy the live tables' definitions
+    restore_pending_objects(options.workers)
+    with postgres_connection(PG_DSL) as pg_conn:
+        dependencies = get_table_dependencies(pg_conn, TABLE_MAPPING)
+
+    try:
+        # one process budget for the run, the scheduler threads share it
+        with schema_context(options), process_pool(
+                options.workers
+        ) as executor:
+            run_scheduled(
+                dependencies,
+                partial(
+                    migrate_table,
+                    options=options,
+                    metrics=metrics,
+                    executor=executor,
+                ),
+                options.workers,
+            )
+        if not options.incremental:
+            Checkpoint.clear_all(State())
+    finally:
+        close_pools()
+        logger.info("ETL metrics:\n%s", metrics.summary())
+        metrics.export()
+    return metrics
+
 
-        for table_name, model in TABLE_MAPPING.items():
-            data = sqlite_loader.extract_data(table_name)
-            transformed_data = sqlite_loader.transform_data(data, model)
-            postgres_saver.load_data(transformed_data, table_name)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Migrate the movies catalogue from SQLite to PostgreSQL"
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="load tables over a few asyncio psycopg connections",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    run_etl()
+    args = parse_args()
+    if args.use_async:
+        asyncio.run(run_etl_async())
+    else:
+        run_etl()
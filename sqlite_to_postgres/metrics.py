@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Generator, Iterable
+
+from sqlite_to_postgres.batching import estimate_row_size
+from sqlite_to_postgres.db_settings import (
+    METRICS_FILE,
+    METRICS_FORMAT,
+    METRICS_FORMATS,
+)
+
+_SAMPLE_ROWS = 8
+_local = threading.local()
+
+
+def _timing_stack() -> list[list[float]]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@dataclass
+class TableMetrics:
+    rows: int = 0
+    batches: int = 0
+    bytes: int = 0
+    extract_seconds: float = 0.0
+    transform_seconds: float = 0.0
+    load_seconds: float = 0.0
+    commit_seconds: float = 0.0
+    max_commit_seconds: float = 0.0
+    retries: int = 0
+
+    def merge(self, other: "TableMetrics"):
+        for metric in fields(self):
+            name = metric.name
+            if name.startswith("max_"):
+                value = max(getattr(self, name), getattr(other, name))
+            else:
+                value = getattr(self, name) + getattr(other, name)
+            setattr(self, name, value)
+
+
+def _busy_seconds(table: dict) -> float:
+    return sum(
+        table[f"{stage}_seconds"]
+        for stage in ("extract", "transform", "load", "commit")
+    )
+
+
+def estimate_batch_size(batch: list[tuple]) -> int:
+    if not (sample := batch[:_SAMPLE_ROWS]):
+        return 0
+    return sum(map(estimate_row_size, sample)) * len(batch) // len(sample)
+
+
+class EtlMetrics:
+    def __init__(
+            self,
+            metrics_file: str | None = METRICS_FILE,
+            metrics_format: str | None = METRICS_FORMAT,
+    ):
+        if metrics_format is None:
+            metrics_format = (
+                "prometheus"
+                if metrics_file and metrics_file.endswith(".prom")
+                else "jsonl"
+            )
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format '{metrics_format}'")
+        self.metrics_file = metrics_file
+        self.metrics_format = metrics_format
+        self.tables: dict[str, TableMetrics] = {}
+        self.sources: dict[str, TableMetrics] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _table(self, table_name: str) -> TableMetrics:
+        if table_name not in self.tables:
+            self.tables[table_name] = TableMetrics()
+        return self.tables[table_name]
+
+    def _stream(self, event: dict):
+        if self.metrics_file and self.metrics_format == "jsonl":
+            with open(self.metrics_file, "a") as stream:
+                stream.write(json.dumps(event) + "\n")
+
+    def add_stage_time(self, table_name: str, stage: str, seconds: float):
+        with self._lock:
+            table = self._table(table_name)
+            setattr(
+                table,
+                f"{stage}_seconds",
+                getattr(table, f"{stage}_seconds") + seconds,
+            )
+
+    def record_batch(
+            self,
+            table_name: str,
+            batch: list[tuple],
+            load_seconds: float,
+            commit_seconds: float,
+    ):
+        size = estimate_batch_size(batch)
+        with self._lock:
+            table = self._table(table_name)
+            table.rows += len(batch)
+            table.batches += 1
+            table.bytes += size
+            table.load_seconds += load_seconds
+            table.commit_seconds += commit_seconds
+            table.max_commit_seconds = max(
+                table.max_commit_seconds, commit_seconds
+            )
+            self._stream({
+                "event": "batch",
+                "table": table_name,
+                "rows": len(batch),
+                "bytes": size,
+                "load_seconds": load_seconds,
+                "commit_seconds": commit_seconds,
+                "timestamp": time.time(),
+            })
+
+    def record_retry(self, table_name: str):
+        with self._lock:
+            self._table(table_name).retries += 1
+
+    def timed(
+            self,
+            batches: Iterable[list],
+            table_name: str,
+            stage: str,
+            stack: list[list[float]] | None = None,
+    ) -> Generator[list, None, None]:
+        # time spent inside nested timed stages is charged to them, not to
+        # `stage`. They share the thread's stack unless one is passed, e.g.
+        # when the batches are pulled from changing threads
+        iterator = iter(batches)
+        stack = _timing_stack() if stack is None else stack
+        try:
+            while True:
+                nested = [0.0]
+                stack.append(nested)
+                started = time.perf_counter()
+                try:
+                    batch = next(iterator, None)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    stack.pop()
+                    if stack:
+                        stack[-1][0] += elapsed
+                self.add_stage_time(table_name, stage, elapsed - nested[0])
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            if close := getattr(iterator, "close", None):
+                close()
+
+    def to_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: asdict(table) for name, table in self.tables.items()}
+
+    def merge(self, tables: dict[str, dict]):
+        with self._lock:
+            for name, values in tables.items():
+                self._table(name).merge(TableMetrics(**values))
+
+    def record_source(self, source: str, tables: dict[str, dict]):
+        with self._lock:
+            totals = self.sources.setdefault(source, TableMetrics())
+            for values in tables.values():
+                totals.merge(TableMetrics(**values))
+
+    def source_throughput(self, source: str) -> float:
+        with self._lock:
+            totals = self.sources.get(source, TableMetrics())
+        return totals.rows / max(_busy_seconds(asdict(totals)), 1e-9)
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        lines = [
+            f"{'table':<18}{'rows':>11}{'rows/s':>11}{'MiB':>9}"
+            f"{'extract':>9}{'transform':>11}{'load':>8}{'commit':>8}"
+            f"{'retries':>9}"
+        ]
+        for name, table in self.to_dict().items():
+            busy = _busy_seconds(table)
+            lines.append(
+                f"{name:<18}{table['rows']:>11}"
+                f"{table['rows'] / max(busy, 1e-9):>11.0f}"
+                f"{table['bytes'] / 2 ** 20:>9.1f}"
+                f"{table['extract_seconds']:>9.2f}"
+                f"{table['transform_seconds']:>11.2f}"
+                f"{table['load_seconds']:>8.2f}"
+                f"{table['commit_seconds']:>8.2f}"
+                f"{table['retries']:>9}"
+            )
+        if self.sources:
+            lines.append(f"{'shard':<50}{'rows':>11}{'rows/s':>11}")
+            for source in sorted(self.sources):
+                lines.append(
+                    f"{source[-50:]:<50}{self.sources[source].rows:>11}"
+                    f"{self.source_throughput(source):>11.0f}"
+                )
+        lines.append(f"total: {elapsed:.2f} s")
+        return "\n".join(lines)
+
+    def _prometheus_text(self) -> str:
+        lines = []
+        tables = self.to_dict()
+        for metric in fields(TableMetrics):
+            name = f"etl_{metric.name}"
+            kind = "gauge" if metric.name.startswith("max_") else "counter"
+            lines.append(f"# TYPE {name} {kind}")
+            for table_name, table in tables.items():
+                lines.append(
+                    f'{name}{{table="{table_name}"}} {table[metric.name]}'
+                )
+        with self._lock:
+            sources = {
+                source: asdict(totals)
+                for source, totals in self.sources.items()
+            }
+        for metric in fields(TableMetrics) if sources else ():
+            name = f"etl_source_{metric.name}"
+            kind = "gauge" if metric.name.startswith("max_") else "counter"
+            lines.append(f"# TYPE {name} {kind}")
+            for source, totals in sources.items():
+                lines.append(
+                    f'{name}{{source="{source}"}} {totals[metric.name]}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        if not self.metrics_file:
+            return
+        if self.metrics_format == "prometheus":
+            # write then rename so node_exporter never reads a partial file
+            tmp_file = f"{self.metrics_file}.tmp"
+            with open(tmp_file, "w") as textfile:
+                textfile.write(self._prometheus_text())
+            os.replace(tmp_file, self.metrics_file)
+        else:
+            for table_name, table in self.to_dict().items():
+                self._stream({"event": "table", "table": table_name, **table})
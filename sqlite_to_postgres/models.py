@@ -1,10 +1,11 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import date, datetime, UTC
+from functools import cache
 from typing import TypeVar
 from uuid import UUID
 
 
-@dataclass
+@dataclass(slots=True)
 class Genre:
     id: UUID
     name: str
@@ -13,13 +14,13 @@ class Genre:
     updated_at: datetime | None = field(default=None)
 
     def __post_init__(self):
-        if not self.created_at:
-            self.created_at = datetime.now(UTC)
-        if not self.updated_at:
-            self.updated_at = datetime.now(UTC)
+        if not (self.created_at and self.updated_at):
+            now = datetime.now(UTC)
+            self.created_at = self.created_at or now
+            self.updated_at = self.updated_at or now
 
 
-@dataclass
+@dataclass(slots=True)
 class GenreFilmWork:
     id: UUID
     film_work_id: UUID
@@ -31,7 +32,7 @@ class GenreFilmWork:
             self.created_at = datetime.now(UTC)
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonFilmWork:
     id: UUID
     film_work_id: UUID
@@ -44,7 +45,7 @@ class PersonFilmWork:
             self.created_at = datetime.now(UTC)
 
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     id: UUID
     full_name: str
@@ -52,13 +53,13 @@ class Person:
     updated_at: datetime | None = field(default=None)
 
     def __post_init__(self):
-        if not self.created_at:
-            self.created_at = datetime.now(UTC)
-        if not self.updated_at:
-            self.updated_at = datetime.now(UTC)
+        if not (self.created_at and self.updated_at):
+            now = datetime.now(UTC)
+            self.created_at = self.created_at or now
+            self.updated_at = self.updated_at or now
 
 
-@dataclass
+@dataclass(slots=True)
 class FilmWork:
     id: UUID
     title: str
@@ -71,12 +72,19 @@ class FilmWork:
     updated_at: datetime | None = field(default=None)
 
     def __post_init__(self):
-        if not self.created_at:
-            self.created_at = datetime.now(UTC)
-        if not self.updated_at:
-            self.updated_at = datetime.now(UTC)
+        if not (self.created_at and self.updated_at):
+            now = datetime.now(UTC)
+            self.created_at = self.created_at or now
+            self.updated_at = self.updated_at or now
 
 
 T = TypeVar(
     "T", Genre, GenreFilmWork, PersonFilmWork, Person, PersonFilmWork, FilmWork
 )
+
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
+
+@cache
+def get_columns(model: type[T]) -> tuple[str, ...]:
+    return tuple(model_field.name for model_field in fields(model))
@@ -0,0 +1,74 @@
+import glob
+from dataclasses import dataclass, replace
+
+from sqlite_to_postgres.db_settings import (
+    ADAPTIVE_BATCHING,
+    ETL_DEFER_SCHEMA,
+    ETL_INCREMENTAL,
+    ETL_PARTITIONS,
+    ETL_PIPELINE,
+    ETL_RESUME,
+    ETL_SWAP_TABLES,
+    ETL_WORKERS,
+    LOAD_MODE,
+    PIPELINE_QUEUE_SIZE,
+    POOL_SIZE,
+    SQLITE_DB_PATH,
+    SQLITE_FAST_READ,
+    SQLITE_SHARDS,
+)
+
+
+def split_patterns(spec: str) -> tuple[str, ...]:
+    return tuple(filter(None, map(str.strip, spec.split(","))))
+
+
+def glob_shards(patterns: tuple[str, ...]) -> tuple[str, ...]:
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No SQLite shards match '{pattern}'")
+        paths.extend(path for path in matches if path not in paths)
+    return tuple(paths)
+
+
+def parse_shards(spec: str) -> tuple[str, ...]:
+    return glob_shards(split_patterns(spec))
+
+
+@dataclass(frozen=True)
+class EtlOptions:
+    sqlite_path: str = SQLITE_DB_PATH
+    load_mode: str = LOAD_MODE
+    workers: int = ETL_WORKERS
+    partitions: int = ETL_PARTITIONS
+    incremental: bool = ETL_INCREMENTAL
+    resume: bool = ETL_RESUME
+    pipeline: bool = ETL_PIPELINE
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    adaptive_batching: bool = ADAPTIVE_BATCHING
+    defer_schema: bool = ETL_DEFER_SCHEMA
+    swap_tables: bool = ETL_SWAP_TABLES
+    fast_read: bool = SQLITE_FAST_READ
+    # paths or glob patterns until expand_shards() resolves them at the
+    # start of a run
+    shards: tuple[str, ...] = split_patterns(SQLITE_SHARDS)
+
+    def expand_shards(self) -> "EtlOptions":
+        return replace(self, shards=glob_shards(self.shards))
+
+    @property
+    def pool_size(self) -> int:
+        # each scheduler thread holds a connection for a whole table and
+        # schema rebuilds fan out over as many more, plus the run's own
+        return max(POOL_SIZE, 2 * max(self.workers, 1) + 1)
+
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        return self.shards or (self.sqlite_path,)
+
+    @property
+    def source_key(self) -> str | None:
+        # checkpoints of a shard are kept apart from the other shards'
+        return self.sqlite_path if self.shards else None
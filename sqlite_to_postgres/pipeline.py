@@ -0,0 +1,53 @@
+import queue
+import threading
+from typing import Generator, Iterable, TypeVar
+
+Item = TypeVar("Item")
+
+_DONE = object()
+
+
+class _StageFailure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+# The producer thread blocks once `maxsize` items wait in the queue, its
+# errors are re-raised to the consumer, and closing the consumer stops it.
+def run_stage(
+        iterable: Iterable[Item], maxsize: int, name: str = "etl-stage"
+) -> Generator[Item, None, None]:
+    items = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as error:
+            put(_StageFailure(error))
+        finally:
+            if close := getattr(iterable, "close", None):
+                close()
+
+    producer = threading.Thread(target=produce, name=name, daemon=True)
+    producer.start()
+    try:
+        while (item := items.get()) is not _DONE:
+            if isinstance(item, _StageFailure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
@@ -1,60 +1,159 @@
 import logging
-import sqlite3
-from typing import Generator, KeysView
+import time
+from typing import Callable, Iterable
 
 import psycopg
 from psycopg.errors import UndefinedTable
+from psycopg.rows import tuple_row
 
-from sqlite_to_postgres.db_settings import COLUMN_MAPPING, FILTER_OUT_COLUMNS
-from sqlite_to_postgres.models import T
+from sqlite_to_postgres.columnar import (
+    COPY_HEADER,
+    COPY_TRAILER,
+    encode_copy_batch,
+    get_encoders,
+)
+from sqlite_to_postgres.copy_rows import (
+    convert_row,
+    get_column_types,
+    get_column_types_query,
+    get_converters,
+)
+from sqlite_to_postgres.db_settings import LOAD_MODE, LOAD_MODES, LOAD_RETRIES
+from sqlite_to_postgres.load_plan import LoadPlan, get_load_plan
+from sqlite_to_postgres.metrics import EtlMetrics
+from sqlite_to_postgres.retries import RETRYABLE_ERRORS, handle_retryable_error
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class PostgresSaver:
-    def __init__(self, connection: psycopg.connection):
+    def __init__(
+            self,
+            connection: psycopg.connection,
+            load_mode: str = LOAD_MODE,
+            upsert: bool = False,
+            metrics: EtlMetrics | None = None,
+            retries: int = LOAD_RETRIES,
+            table_suffix: str = "",
+    ):
+        if load_mode not in LOAD_MODES:
+            raise ValueError(
+                f"Unknown load mode '{load_mode}', expected one of {LOAD_MODES}"
+            )
         self.connection = connection
+        self.load_mode = load_mode
+        self.upsert = upsert
+        self.metrics = metrics or EtlMetrics(metrics_file=None)
+        self.retries = retries
+        self.table_suffix = table_suffix
+
+    def target_table(self, table_name: str) -> str:
+        return f"{table_name}{self.table_suffix}"
+
+    def _get_column_types(self, plan: LoadPlan) -> list[tuple[int, str]]:
+        with self.connection.cursor(row_factory=tuple_row) as cursor:
+            cursor.execute(*get_column_types_query(plan))
+            return get_column_types(cursor, plan)
+
+    def _prepare_insert(
+            self, pg_cursor: psycopg.Cursor, plan: LoadPlan
+    ) -> Callable[[list[tuple]], None]:
+        insert_query = plan.get_insert_query(self.upsert)
+
+        def write_batch(batch: list[tuple]):
+            pg_cursor.executemany(insert_query, batch)
 
-    @staticmethod
-    def _map_row(
-            row: sqlite3.Row, column_mapping: dict, original_columns: KeysView
+        return write_batch
+
+    def _create_staging_table(
+            self, pg_cursor: psycopg.Cursor, plan: LoadPlan
     ):
-        return tuple(
-            getattr(row, col) if col in column_mapping else getattr(row, col)
-            for col in original_columns
-            if col not in FILTER_OUT_COLUMNS
+        pg_cursor.execute(plan.staging_query)
+        self.connection.commit()
+
+    def _prepare_copy(
+            self, pg_cursor: psycopg.Cursor, plan: LoadPlan
+    ) -> Callable[[list[tuple]], None]:
+        self._create_staging_table(pg_cursor, plan)
+        column_types = self._get_column_types(plan)
+        type_oids = [oid for oid, _ in column_types]
+        converters = get_converters(column_types)
+        merge_query = plan.get_merge_query(self.upsert)
+
+        def write_batch(batch: list[tuple]):
+            with pg_cursor.copy(plan.copy_query) as copy:
+                copy.set_types(type_oids)
+                for row in batch:
+                    copy.write_row(convert_row(row, converters))
+            pg_cursor.execute(merge_query)
+
+        return write_batch
+
+    def _prepare_columnar(
+            self, pg_cursor: psycopg.Cursor, plan: LoadPlan
+    ) -> Callable[[list[tuple]], None]:
+        self._create_staging_table(pg_cursor, plan)
+        encoders = get_encoders(
+            [type_name for _, type_name in self._get_column_types(plan)]
+        )
+        merge_query = plan.get_merge_query(self.upsert)
+
+        def write_batch(batch: list[tuple]):
+            # the batch is encoded column by column into a PGCOPY stream,
+            # bypassing psycopg's per-value dumpers
+            data = encode_copy_batch(batch, encoders)
+            with pg_cursor.copy(plan.copy_query) as copy:
+                copy.write(COPY_HEADER)
+                copy.write(data)
+                copy.write(COPY_TRAILER)
+            pg_cursor.execute(merge_query)
+
+        return write_batch
+
+    def _save_batch(
+            self,
+            batch: list[tuple],
+            table_name: str,
+            write_batch: Callable[[list[tuple]], None],
+    ):
+        for attempt in range(self.retries + 1):
+            try:
+                started = time.perf_counter()
+                write_batch(batch)
+                written = time.perf_counter()
+                self.connection.commit()
+                committed = time.perf_counter()
+                break
+            except RETRYABLE_ERRORS as error:
+                self.connection.rollback()
+                handle_retryable_error(
+                    error, table_name, attempt, self.retries, self.metrics
+                )
+        self.metrics.record_batch(
+            table_name, batch, written - started, committed - written
         )
 
     def load_data(
             self,
-            transformed_data: Generator[list[T], None, None],
+            transformed_data: Iterable[list[tuple]],
             table_name: str,
+            on_commit: Callable[[list[tuple]], None] | None = None,
     ):
-        pg_cursor = self.connection.cursor()
+        plan = get_load_plan(table_name, self.target_table(table_name))
+        # server-side binding lets psycopg prepare the plan's fixed statement
+        pg_cursor = psycopg.Cursor(self.connection)
         try:
+            if self.load_mode == "copy":
+                write_batch = self._prepare_copy(pg_cursor, plan)
+            elif self.load_mode == "columnar":
+                write_batch = self._prepare_columnar(pg_cursor, plan)
+            else:
+                write_batch = self._prepare_insert(pg_cursor, plan)
             for batch in transformed_data:
-                original_columns = batch[0].__dict__.keys()
-                mapped_columns = [
-                    COLUMN_MAPPING.get(col, col)
-                    for col in original_columns
-                    if col not in FILTER_OUT_COLUMNS
-                ]
-                columns = ", ".join(mapped_columns)
-                placeholders = ", ".join(["%s"] * len(mapped_columns))
-                insert_query = (
-                    f"INSERT INTO content.{table_name} ({columns}) "
-                    f"VALUES ({placeholders}) "
-                    f"ON CONFLICT (id) DO NOTHING"
-                )
-                pg_cursor.executemany(
-                    insert_query,
-                    [
-                        self._map_row(row, COLUMN_MAPPING, original_columns)
-                        for row in batch
-                    ],
-                )
-                self.connection.commit()
+                self._save_batch(batch, table_name, write_batch)
+                if on_commit:
+                    on_commit(batch)
         except UndefinedTable:
             logger.exception(f"The table '%s' doesn't exist in the DB", table_name)
             self.connection.rollback()
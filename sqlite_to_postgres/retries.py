@@ -0,0 +1,28 @@
+import logging
+
+from psycopg.errors import DeadlockDetected, SerializationFailure
+
+from sqlite_to_postgres.metrics import EtlMetrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (DeadlockDetected, SerializationFailure)
+
+
+def handle_retryable_error(
+        error: Exception,
+        table_name: str,
+        attempt: int,
+        retries: int,
+        metrics: EtlMetrics,
+):
+    # called once the failed batch is rolled back, re-raises the error
+    # when no attempt is left
+    if attempt >= retries:
+        raise error
+    metrics.record_retry(table_name)
+    logger.warning(
+        "Retrying a batch of the table '%s' (attempt %s)",
+        table_name, attempt + 1, exc_info=error,
+    )
@@ -0,0 +1,73 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+import psycopg
+from psycopg.rows import tuple_row
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_table_dependencies(
+        connection: psycopg.Connection, tables: Iterable[str]
+) -> dict[str, set[str]]:
+    dependencies = {table: set() for table in tables}
+    with connection.cursor(row_factory=tuple_row) as cursor:
+        cursor.execute(
+            "SELECT child.relname, parent.relname "
+            "FROM pg_constraint con "
+            "JOIN pg_class child ON child.oid = con.conrelid "
+            "JOIN pg_class parent ON parent.oid = con.confrelid "
+            "JOIN pg_namespace ns ON ns.oid = child.relnamespace "
+            "WHERE con.contype = 'f' AND ns.nspname = 'content'"
+        )
+        for child, parent in cursor:
+            if child in dependencies and parent in dependencies and (
+                    child != parent
+            ):
+                dependencies[child].add(parent)
+    connection.commit()
+    return dependencies
+
+
+def run_scheduled(
+        dependencies: dict[str, set[str]],
+        worker: Callable[[str], None],
+        max_workers: int,
+):
+    pending = {table: set(parents) for table, parents in dependencies.items()}
+    running: dict[Future, str] = {}
+    failed: list[tuple[str, BaseException]] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            if not failed:
+                for table in [t for t, parents in pending.items() if not parents]:
+                    del pending[table]
+                    logger.info("Starting migration of the table '%s'", table)
+                    running[executor.submit(worker, table)] = table
+            if not running:
+                if pending and not failed:
+                    raise ValueError(
+                        f"Cyclic table dependencies: {sorted(pending)}"
+                    )
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table = running.pop(future)
+                if error := future.exception():
+                    logger.error(
+                        "Migration of the table '%s' failed", table,
+                        exc_info=error,
+                    )
+                    failed.append((table, error))
+                    continue
+                logger.info("Finished migration of the table '%s'", table)
+                for parents in pending.values():
+                    parents.discard(table)
+
+    if failed:
+        table, error = failed[0]
+        raise RuntimeError(f"Migration of the table '{table}' failed") from error
@@ -0,0 +1,185 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+import psycopg
+from psycopg.rows import tuple_row
+
+from sqlite_to_postgres.connections import postgres_connection
+from sqlite_to_postgres.db_settings import PG_DSL
+from sqlite_to_postgres.state import State
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFERRED_STATE_KEY = "deferred_schema"
+
+# indexes backing primary key and unique constraints come with the keys
+INDEXES_QUERY = (
+    "SELECT CASE WHEN ind.indisunique THEN 'unique_index' ELSE 'index' END, "
+    "tbl.relname, idx.relname, pg_get_indexdef(idx.oid) "
+    "FROM pg_index ind "
+    "JOIN pg_class tbl ON tbl.oid = ind.indrelid "
+    "JOIN pg_class idx ON idx.oid = ind.indexrelid "
+    "JOIN pg_namespace ns ON ns.oid = tbl.relnamespace "
+    "WHERE ns.nspname = 'content' AND tbl.relname = ANY(%s) "
+    "AND NOT EXISTS (SELECT 1 FROM pg_constraint con "
+    "WHERE con.conindid = ind.indexrelid AND con.conrelid = ind.indrelid "
+    "AND con.contype IN ('p', 'u', 'x')) "
+    "ORDER BY tbl.relname, idx.relname"
+)
+
+CONSTRAINTS_QUERY = (
+    "SELECT CASE WHEN con.contype = 'f' THEN 'foreign_key' ELSE 'key' END, "
+    "tbl.relname, con.conname, pg_get_constraintdef(con.oid) "
+    "FROM pg_constraint con "
+    "JOIN pg_class tbl ON tbl.oid = con.conrelid "
+    "JOIN pg_namespace ns ON ns.oid = tbl.relnamespace "
+    "WHERE con.contype IN ('p', 'u', 'f') AND ns.nspname = 'content' "
+    "AND tbl.relname = ANY(%s) "
+    "ORDER BY tbl.relname, con.conname"
+)
+
+# internal triggers belong to foreign keys and come back with them
+TRIGGERS_QUERY = (
+    "SELECT 'trigger', tbl.relname, trg.tgname, pg_get_triggerdef(trg.oid) "
+    "FROM pg_trigger trg "
+    "JOIN pg_class tbl ON tbl.oid = trg.tgrelid "
+    "JOIN pg_namespace ns ON ns.oid = tbl.relnamespace "
+    "WHERE NOT trg.tgisinternal AND ns.nspname = 'content' "
+    "AND tbl.relname = ANY(%s) "
+    "ORDER BY tbl.relname, trg.tgname"
+)
+
+# unique indexes and keys stay: ON CONFLICT and duplicate detection during
+# the load rely on them
+DEFERRABLE_KINDS = ("index", "foreign_key")
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaObject:
+    kind: str
+    table_name: str
+    name: str
+    definition: str
+
+
+def get_schema_objects(
+        connection: psycopg.Connection, tables: Iterable[str]
+) -> list[SchemaObject]:
+    tables = list(tables)
+    objects = []
+    with connection.cursor(row_factory=tuple_row) as cursor:
+        for query in (INDEXES_QUERY, CONSTRAINTS_QUERY, TRIGGERS_QUERY):
+            cursor.execute(query, (tables,))
+            objects.extend(SchemaObject(*row) for row in cursor)
+    connection.commit()
+    return objects
+
+
+def get_deferrable_objects(
+        connection: psycopg.Connection, tables: Iterable[str]
+) -> list[SchemaObject]:
+    return [
+        obj for obj in get_schema_objects(connection, tables)
+        if obj.kind in DEFERRABLE_KINDS
+    ]
+
+
+def drop_objects(connection: psycopg.Connection, objects: list[SchemaObject]):
+    with connection.cursor() as cursor:
+        for obj in objects:
+            if obj.kind in ("index", "unique_index"):
+                cursor.execute(f"DROP INDEX IF EXISTS content.{obj.name}")
+            else:
+                cursor.execute(
+                    f"ALTER TABLE content.{obj.table_name} "
+                    f"DROP CONSTRAINT IF EXISTS {obj.name}"
+                )
+    connection.commit()
+
+
+def create_index_statement(obj: SchemaObject) -> str:
+    return obj.definition.replace("INDEX ", "INDEX IF NOT EXISTS ", 1)
+
+
+def validate_statement(obj: SchemaObject) -> str:
+    return (
+        f"ALTER TABLE content.{obj.table_name} VALIDATE CONSTRAINT {obj.name}"
+    )
+
+
+def add_foreign_key(connection: psycopg.Connection, obj: SchemaObject):
+    exists = connection.execute(
+        "SELECT 1 FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND conname = %s",
+        (f"content.{obj.table_name}", obj.name),
+    ).fetchone()
+    if not exists:
+        # NOT VALID skips the scan so every constraint comes back at once
+        connection.execute(
+            f"ALTER TABLE content.{obj.table_name} "
+            f"ADD CONSTRAINT {obj.name} {obj.definition} NOT VALID"
+        )
+
+
+def _execute(statement: str):
+    with postgres_connection(PG_DSL, autocommit=True) as conn:
+        conn.execute(statement)
+    logger.info("Finished '%s'", statement)
+
+
+def execute_parallel(statements: list[str], max_workers: int):
+    # each statement gets its own connection so the builds overlap
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_execute, statement) for statement in statements
+        ]
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+        raise RuntimeError(
+            f"{len(errors)} of {len(statements)} schema statements failed"
+        ) from errors[0]
+
+
+def restore_objects(objects: list[SchemaObject], max_workers: int):
+    foreign_keys = [obj for obj in objects if obj.kind == "foreign_key"]
+    with postgres_connection(PG_DSL) as conn:
+        for obj in foreign_keys:
+            add_foreign_key(conn, obj)
+        conn.commit()
+
+    execute_parallel(
+        [create_index_statement(obj) for obj in objects if obj.kind == "index"]
+        + [validate_statement(obj) for obj in foreign_keys],
+        max_workers,
+    )
+
+
+def restore_pending_objects(max_workers: int):
+    state = State()
+    # a previous run died before it could put its objects back
+    if pending := state.get_state(DEFERRED_STATE_KEY):
+        logger.warning("Restoring schema objects left by a previous run")
+        restore_objects([SchemaObject(**obj) for obj in pending], max_workers)
+        state.delete_state(DEFERRED_STATE_KEY)
+
+
+@contextmanager
+def deferred_schema(tables: Iterable[str], max_workers: int):
+    state = State()
+    with postgres_connection(PG_DSL) as conn:
+        objects = get_deferrable_objects(conn, tables)
+        state.set_state(DEFERRED_STATE_KEY, [asdict(obj) for obj in objects])
+        drop_objects(conn, objects)
+    logger.info(
+        "Deferred %s indexes and foreign keys until the load finishes",
+        len(objects),
+    )
+    try:
+        yield objects
+    finally:
+        restore_objects(objects, max_workers)
+        state.delete_state(DEFERRED_STATE_KEY)
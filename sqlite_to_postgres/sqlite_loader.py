@@ -1,33 +1,131 @@
 import logging
+import math
 import sqlite3
+from datetime import UTC, datetime
 from typing import Generator
 
-from sqlite_to_postgres.db_settings import BATCH_SIZE
-from sqlite_to_postgres.models import T
+from sqlite_to_postgres.db_settings import FETCH_SIZE
+from sqlite_to_postgres.load_plan import get_load_plan, get_source_columns
+from sqlite_to_postgres.models import T, TIMESTAMP_COLUMNS, get_columns
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class SQLiteLoader:
-    def __init__(self, connection: sqlite3.Connection):
+    def __init__(
+            self,
+            connection: sqlite3.Connection,
+            fetch_size: int = FETCH_SIZE,
+            raw_rows: bool = False,
+    ):
         self.connection = connection
-        self.connection.row_factory = sqlite3.Row
+        # plain tuples come straight from the cursor in the plan's column
+        # order, without building a Row object per row
+        self.connection.row_factory = None if raw_rows else sqlite3.Row
+        self.fetch_size = fetch_size
 
-    def extract_data(
-            self, table_name: str
+    @staticmethod
+    def get_watermark_column(model: type[T]) -> str:
+        return (
+            "updated_at" if "updated_at" in get_columns(model) else "created_at"
+        )
+
+    def get_rowid_ranges(
+            self, table_name: str, partitions: int, min_rows: int = 0
+    ) -> list[tuple[int, int]]:
+        sqlite_cursor = self.connection.cursor()
+        try:
+            sqlite_cursor.execute(
+                f"SELECT MIN(rowid), MAX(rowid) FROM {table_name}"
+            )
+        except sqlite3.OperationalError:
+            logger.exception(f"No such table '%s' in the DB", table_name)
+            return []
+        low, high = sqlite_cursor.fetchone()
+        if low is None:
+            return []
+        span = high - low + 1
+        if span < min_rows:
+            partitions = 1
+        step = math.ceil(span / max(partitions, 1))
+        return [
+            (start, min(start + step, high + 1))
+            for start in range(low, high + 1, step)
+        ]
+
+    def _fetch_batches(
+            self, table_name: str, query: str, params: tuple = ()
     ) -> Generator[list[sqlite3.Row], None, None]:
         sqlite_cursor = self.connection.cursor()
         try:
-            sqlite_cursor.execute(f"SELECT * FROM {table_name}")
+            sqlite_cursor.execute(query, params)
         except sqlite3.OperationalError:
             logger.exception(f"No such table '%s' in the DB", table_name)
-        while rows := sqlite_cursor.fetchmany(BATCH_SIZE):
+        while rows := sqlite_cursor.fetchmany(self.fetch_size):
             yield rows
 
+    def extract_data(
+            self,
+            table_name: str,
+            rowid_range: tuple[int, int] | None = None,
+            after_id: str | None = None,
+    ) -> Generator[list[sqlite3.Row], None, None]:
+        conditions, params = [], []
+        if rowid_range:
+            conditions.append("rowid >= ? AND rowid < ?")
+            params.extend(rowid_range)
+        if after_id:
+            row = self.connection.execute(
+                f"SELECT rowid FROM {table_name} WHERE id = ?", (after_id,)
+            ).fetchone()
+            if row:
+                conditions.append("rowid > ?")
+                params.append(row[0])
+            else:
+                # ON CONFLICT skips the rows that were already loaded
+                logger.warning(
+                    "Checkpointed id %s is gone from '%s', loading the "
+                    "whole range again", after_id, table_name,
+                )
+        query = get_load_plan(table_name).select_query
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY rowid"
+        return self._fetch_batches(table_name, query, tuple(params))
+
+    def extract_changes(
+            self,
+            table_name: str,
+            watermark_column: str,
+            watermark: tuple[str, str] | None = None,
+    ) -> Generator[list[sqlite3.Row], None, None]:
+        query, params = get_load_plan(table_name).select_query, ()
+        if watermark:
+            query += f" WHERE ({watermark_column}, id) > (?, ?)"
+            params = tuple(watermark)
+        query += f" ORDER BY {watermark_column}, id"
+        return self._fetch_batches(table_name, query, params)
+
     @staticmethod
     def transform_data(
             rows: Generator[list[sqlite3.Row], None, None], model: type[T]
-    ) -> Generator[list[T], None, None]:
+    ) -> Generator[list[tuple], None, None]:
+        timestamp_indexes = [
+            index
+            for index, column in enumerate(get_source_columns(model))
+            if column in TIMESTAMP_COLUMNS
+        ]
         for batch in rows:
-            yield [model(**dict(row)) for row in batch]
+            now = datetime.now(UTC)
+            records = []
+            for row in batch:
+                record = tuple(row)
+                if any(record[index] is None for index in timestamp_indexes):
+                    record = list(record)
+                    for index in timestamp_indexes:
+                        if record[index] is None:
+                            record[index] = now
+                    record = tuple(record)
+                records.append(record)
+            yield records
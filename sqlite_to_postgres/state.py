@@ -0,0 +1,55 @@
+import json
+import sqlite3
+import threading
+from typing import Any
+
+from sqlite_to_postgres.db_settings import STATE_FILE_PATH
+
+
+# SQLite file locking lets scheduler threads and partition processes share it
+class State:
+    def __init__(self, file_path: str = STATE_FILE_PATH):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        # one connection per State, checkpoints are saved after every batch
+        self._conn = sqlite3.connect(
+            file_path, timeout=30, check_same_thread=False
+        )
+        # WAL at NORMAL syncs on checkpoints rather than on every commit, an
+        # OS crash may lose the last saves and resume loads those rows again
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS etl_state "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM etl_state WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key: str, value: Any):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO etl_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+
+    def delete_state(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM etl_state WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM etl_state WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
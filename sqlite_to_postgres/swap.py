@@ -0,0 +1,228 @@
+import logging
+from contextlib import ExitStack, contextmanager
+from typing import Iterable
+
+import psycopg
+
+from sqlite_to_postgres.connections import postgres_connection
+from sqlite_to_postgres.db_settings import PG_DSL, TABLE_MAPPING
+from sqlite_to_postgres.options import EtlOptions
+from sqlite_to_postgres.schema import (
+    SchemaObject,
+    create_index_statement,
+    deferred_schema,
+    execute_parallel,
+    get_schema_objects,
+    validate_statement,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RELOAD_SUFFIX = "_reload"
+
+# LIKE copies neither privileges, comments nor the owner: statements that
+# put them on the reloaded table, the owner last while the grants are still
+# the ETL role's to make
+TABLE_SETTINGS_QUERY = (
+    "SELECT statement FROM ("
+    "SELECT 1 AS step, format('GRANT %%s ON TABLE %%s TO %%s%%s', "
+    "acl.privilege_type, tbl.oid::regclass, "
+    "CASE WHEN acl.grantee = 0 THEN 'PUBLIC' "
+    "ELSE quote_ident(pg_get_userbyid(acl.grantee)) END, "
+    "CASE WHEN acl.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END) "
+    "AS statement "
+    "FROM pg_class tbl, aclexplode(tbl.relacl) acl "
+    "WHERE tbl.oid = ANY(%(tables)s::regclass[]) "
+    "AND acl.grantee <> tbl.relowner "
+    "UNION ALL "
+    "SELECT 1, format('GRANT %%s (%%I) ON TABLE %%s TO %%s%%s', "
+    "acl.privilege_type, att.attname, tbl.oid::regclass, "
+    "CASE WHEN acl.grantee = 0 THEN 'PUBLIC' "
+    "ELSE quote_ident(pg_get_userbyid(acl.grantee)) END, "
+    "CASE WHEN acl.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END) "
+    "FROM pg_class tbl "
+    "JOIN pg_attribute att ON att.attrelid = tbl.oid, "
+    "aclexplode(att.attacl) acl "
+    "WHERE tbl.oid = ANY(%(tables)s::regclass[]) "
+    "AND acl.grantee <> tbl.relowner "
+    "UNION ALL "
+    "SELECT 2, format('COMMENT ON TABLE %%s IS %%L', tbl.oid::regclass, "
+    "obj_description(tbl.oid, 'pg_class')) "
+    "FROM pg_class tbl "
+    "WHERE tbl.oid = ANY(%(tables)s::regclass[]) "
+    "AND obj_description(tbl.oid, 'pg_class') IS NOT NULL "
+    "UNION ALL "
+    "SELECT 2, format('COMMENT ON COLUMN %%s.%%I IS %%L', "
+    "tbl.oid::regclass, att.attname, col_description(tbl.oid, att.attnum)) "
+    "FROM pg_class tbl JOIN pg_attribute att ON att.attrelid = tbl.oid "
+    "WHERE tbl.oid = ANY(%(tables)s::regclass[]) AND att.attnum > 0 "
+    "AND col_description(tbl.oid, att.attnum) IS NOT NULL "
+    "UNION ALL "
+    "SELECT 3, format('ALTER TABLE %%s OWNER TO %%I', tbl.oid::regclass, "
+    "pg_get_userbyid(tbl.relowner)) "
+    "FROM pg_class tbl "
+    "WHERE tbl.oid = ANY(%(tables)s::regclass[])"
+    ") settings ORDER BY step"
+)
+
+
+def reload_name(name: str) -> str:
+    return f"{name}{RELOAD_SUFFIX}"
+
+
+def _reload_index_statement(obj: SchemaObject) -> str:
+    return create_index_statement(obj).replace(
+        f" {obj.name} ON content.{obj.table_name} ",
+        f" {reload_name(obj.name)} ON content.{reload_name(obj.table_name)} ",
+        1,
+    )
+
+
+def _reload_trigger_statement(obj: SchemaObject) -> str:
+    return (
+        obj.definition
+        .replace(f" {obj.name} ", f" {reload_name(obj.name)} ", 1)
+        .replace(
+            f" ON content.{obj.table_name} ",
+            f" ON content.{reload_name(obj.table_name)} ",
+            1,
+        )
+    )
+
+
+def create_reload_tables(
+        connection: psycopg.Connection,
+        tables: list[str],
+        objects: list[SchemaObject],
+):
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS content.{reload_name(table)}")
+            # UNLOGGED skips WAL for the bulk load, the table is made logged
+            # again before the swap
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE content.{reload_name(table)} "
+                f"(LIKE content.{table} INCLUDING DEFAULTS "
+                f"INCLUDING CONSTRAINTS)"
+            )
+        # keys and unique indexes are needed while loading for ON CONFLICT,
+        # triggers fill derived columns such as film_work.search_vector
+        for obj in objects:
+            if obj.kind == "key":
+                cursor.execute(
+                    f"ALTER TABLE content.{reload_name(obj.table_name)} "
+                    f"ADD CONSTRAINT {reload_name(obj.name)} {obj.definition}"
+                )
+            elif obj.kind == "unique_index":
+                cursor.execute(_reload_index_statement(obj))
+            elif obj.kind == "trigger":
+                cursor.execute(_reload_trigger_statement(obj))
+    connection.commit()
+
+
+def drop_reload_tables(tables: list[str]):
+    with postgres_connection(PG_DSL) as conn:
+        for table in tables:
+            conn.execute(f"DROP TABLE IF EXISTS content.{reload_name(table)}")
+        conn.commit()
+
+
+def swap_tables(tables: list[str], objects: list[SchemaObject]):
+    foreign_keys = [obj for obj in objects if obj.kind == "foreign_key"]
+    with postgres_connection(PG_DSL) as conn:
+        conn.execute(
+            "LOCK TABLE "
+            + ", ".join(f"content.{table}" for table in tables)
+            + " IN ACCESS EXCLUSIVE MODE"
+        )
+        settings = [
+            statement for statement, in conn.execute(
+                TABLE_SETTINGS_QUERY,
+                {"tables": [f"content.{table}" for table in tables]},
+            )
+        ]
+        for obj in foreign_keys:
+            conn.execute(
+                f"ALTER TABLE content.{obj.table_name} "
+                f"DROP CONSTRAINT {obj.name}"
+            )
+        # without CASCADE a dependency outside these tables aborts the swap
+        for table in tables:
+            conn.execute(f"DROP TABLE content.{table}")
+            conn.execute(
+                f"ALTER TABLE content.{reload_name(table)} RENAME TO {table}"
+            )
+        for obj in objects:
+            if obj.kind == "key":
+                conn.execute(
+                    f"ALTER TABLE content.{obj.table_name} RENAME CONSTRAINT "
+                    f"{reload_name(obj.name)} TO {obj.name}"
+                )
+            elif obj.kind in ("index", "unique_index"):
+                conn.execute(
+                    f"ALTER INDEX content.{reload_name(obj.name)} "
+                    f"RENAME TO {obj.name}"
+                )
+            elif obj.kind == "trigger":
+                conn.execute(
+                    f"ALTER TRIGGER {reload_name(obj.name)} "
+                    f"ON content.{obj.table_name} RENAME TO {obj.name}"
+                )
+        for obj in foreign_keys:
+            conn.execute(
+                f"ALTER TABLE content.{obj.table_name} "
+                f"ADD CONSTRAINT {obj.name} {obj.definition} NOT VALID"
+            )
+        for statement in settings:
+            conn.execute(statement)
+        conn.commit()
+
+
+@contextmanager
+def table_swap(tables: Iterable[str], max_workers: int):
+    tables = list(tables)
+    with postgres_connection(PG_DSL) as conn:
+        objects = get_schema_objects(conn, tables)
+        create_reload_tables(conn, tables, objects)
+    logger.info("Loading into unlogged copies of %s", ", ".join(tables))
+    try:
+        yield objects
+        execute_parallel(
+            [
+                f"ALTER TABLE content.{reload_name(table)} SET LOGGED"
+                for table in tables
+            ],
+            max_workers,
+        )
+        execute_parallel(
+            [
+                _reload_index_statement(obj)
+                for obj in objects if obj.kind == "index"
+            ],
+            max_workers,
+        )
+        swap_tables(tables, objects)
+    except BaseException:
+        logger.error("Dropping the reload tables, the live ones are intact")
+        drop_reload_tables(tables)
+        raise
+    logger.info("Swapped the reloaded tables into place")
+    execute_parallel(
+        [
+            validate_statement(obj)
+            for obj in objects if obj.kind == "foreign_key"
+        ],
+        max_workers,
+    )
+
+
+def schema_context(options: EtlOptions) -> ExitStack:
+    stack = ExitStack()
+    if options.swap_tables:
+        if options.incremental:
+            raise ValueError("Table swap needs a full reload, not increments")
+        stack.enter_context(table_swap(TABLE_MAPPING, options.workers))
+    elif options.defer_schema:
+        stack.enter_context(deferred_schema(TABLE_MAPPING, options.workers))
+    return stack
@@ -1,10 +1,10 @@
 import sqlite3
 
-import psycopg
 import pytest
 from psycopg import ClientCursor
 from psycopg.rows import dict_row
 
+from sqlite_to_postgres.connections import get_pool
 from sqlite_to_postgres.db_settings import PG_DSL, SQLITE_DB_PATH
 
 
@@ -15,10 +15,16 @@ def sqlite_connection():
     conn.close()
 
 
-@pytest.fixture
-def pg_connection():
-    conn = psycopg.connect(
-        **PG_DSL, row_factory=dict_row, cursor_factory=ClientCursor
+@pytest.fixture(scope="session")
+def pg_pool():
+    pool = get_pool(
+        PG_DSL, max_size=2, row_factory=dict_row, cursor_factory=ClientCursor
     )
-    yield conn
-    conn.close()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pg_connection(pg_pool):
+    with pg_pool.connection() as conn:
+        yield conn
@@ -0,0 +1,41 @@
+from sqlite_to_postgres.batching import AdaptiveBatcher
+
+
+def _rows(count: int, width: int = 10) -> list[tuple]:
+    return [("x" * width, index) for index in range(count)]
+
+
+def test_fixed_batch_size_is_decoupled_from_fetch_size():
+    batcher = AdaptiveBatcher(adaptive=False, batch_size=100)
+    batches = list(batcher.rebatch([_rows(250), _rows(250)]))
+
+    assert [len(batch) for batch in batches] == [100, 100, 100, 100, 100]
+
+
+def test_memory_ceiling_caps_batch_size():
+    batcher = AdaptiveBatcher(
+        adaptive=False, batch_size=1_000, max_bytes=10 * 1026
+    )
+    batches = list(batcher.rebatch([_rows(100, width=1_000)]))
+
+    assert {len(batch) for batch in batches} == {10}
+
+
+def test_batch_grows_while_throughput_improves_and_backs_off():
+    batcher = AdaptiveBatcher(batch_size=100, min_size=50, max_size=800)
+
+    batcher.tune(rows=100, elapsed=1.0)
+    assert batcher.batch_size == 200
+    batcher.tune(rows=200, elapsed=1.0)
+    assert batcher.batch_size == 400
+    batcher.tune(rows=400, elapsed=4.0)
+    assert batcher.batch_size == 200
+
+
+def test_batch_size_stays_within_bounds():
+    batcher = AdaptiveBatcher(batch_size=100, min_size=50, max_size=300)
+
+    for rows in (100, 200, 300, 300):
+        batcher.tune(rows=rows, elapsed=rows / 1_000_000)
+
+    assert 50 <= batcher.batch_size <= 300
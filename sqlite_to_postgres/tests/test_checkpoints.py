@@ -0,0 +1,105 @@
+from datetime import UTC, datetime
+
+from sqlite_to_postgres.checkpoints import Checkpoint, Watermark
+from sqlite_to_postgres.state import State
+
+
+def _genre(index: int, updated_at=None) -> tuple:
+    return (f"id-{index}", f"genre {index}", None, None, updated_at)
+
+
+def test_checkpoint_resumes_after_the_last_saved_id(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+
+    Checkpoint(state, "genre").save([_genre(1), _genre(2)])
+    checkpoint = Checkpoint(state, "genre")
+
+    assert checkpoint.last_id == "id-2"
+    assert not checkpoint.done
+    assert Checkpoint(state, "genre", resume=False).last_id is None
+
+    checkpoint.finish()
+
+    assert Checkpoint(state, "genre").done
+
+
+def test_checkpoint_keys_are_per_range_and_source(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+
+    Checkpoint(state, "genre", (1, 10), source="a.sqlite").finish()
+
+    assert Checkpoint(state, "genre", (1, 10), source="a.sqlite").done
+    assert not Checkpoint(state, "genre", (11, 20), source="a.sqlite").done
+    assert not Checkpoint(state, "genre", (1, 10), source="b.sqlite").done
+    assert not Checkpoint(state, "genre").done
+
+
+def test_clear_all_keeps_watermarks_and_other_state(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+    Checkpoint(state, "genre").finish()
+    Checkpoint(state, "genre_film_work", (1, 10)).save([("id-1",)])
+    Watermark(state, "genre").save([_genre(1, "2021-06-16 20:14:09")])
+    state.set_state("deferred_schema", [])
+
+    Checkpoint.clear_all(state)
+
+    assert not Checkpoint(state, "genre").done
+    assert Checkpoint(state, "genre_film_work", (1, 10)).last_id is None
+    assert Watermark(state, "genre").value == [
+        "2021-06-16 20:14:09", "id-1"
+    ]
+    assert state.get_state("deferred_schema") == []
+
+
+def test_watermark_skips_rows_with_generated_timestamps(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+    watermark = Watermark(state, "genre")
+
+    assert watermark.column == "updated_at"
+    assert watermark.value is None
+
+    watermark.save(
+        [
+            _genre(1, "2021-06-16 20:14:09"),
+            _genre(2, datetime(2024, 1, 1, tzinfo=UTC)),
+        ]
+    )
+
+    assert Watermark(state, "genre").value == ["2021-06-16 20:14:09", "id-1"]
+    assert Watermark(state, "genre", source="b.sqlite").value is None
+
+
+def test_state_keeps_one_wal_connection(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+    state.set_state("checkpoint:genre", {"last_id": "id-1"})
+
+    assert state._conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert State(str(tmp_path / "state.sqlite3")).get_state(
+        "checkpoint:genre"
+    ) == {"last_id": "id-1"}
+
+
+class Target:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def execute(self, query, params):
+        return self
+
+    def fetchone(self):
+        return (1,) if self.ids else None
+
+
+def test_checkpoint_is_discarded_once_the_target_lost_its_rows(tmp_path):
+    state = State(str(tmp_path / "state.sqlite3"))
+    checkpoint = Checkpoint(state, "genre")
+    checkpoint.save([_genre(1)])
+    checkpoint.finish()
+
+    kept = Checkpoint(state, "genre")
+    kept.validate(Target(["id-1"]))
+    truncated = Checkpoint(state, "genre")
+    truncated.validate(Target([]))
+
+    assert (kept.done, kept.last_id) == (True, "id-1")
+    assert (truncated.done, truncated.last_id) == (False, None)
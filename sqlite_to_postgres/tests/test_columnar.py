@@ -0,0 +1,47 @@
+import struct
+from uuid import UUID
+
+from sqlite_to_postgres.columnar import (
+    NULL_FIELD,
+    encode_copy_batch,
+    get_encoders,
+)
+
+ID = "3d825f60-9fff-4dfe-b294-1a45fa1e115d"
+
+
+def _field(data: bytes) -> bytes:
+    return struct.pack(">i", len(data)) + data
+
+
+def test_fixed_width_batch_matches_pgcopy_rows():
+    encoders = get_encoders(["uuid", "timestamp with time zone", "date"])
+    batch = [(ID, "2000-01-01 00:00:01+00", "2000-01-03")] * 2
+
+    data = encode_copy_batch(batch, encoders)
+
+    row = (
+        struct.pack(">h", 3)
+        + _field(UUID(ID).bytes)
+        + _field(struct.pack(">q", 1_000_000))
+        + _field(struct.pack(">i", 2))
+    )
+    assert bytes(data) == row * 2
+
+
+def test_nullable_and_text_columns_fall_back_to_row_fields():
+    encoders = get_encoders(["uuid", "text", "double precision"])
+    batch = [(ID, "Drama", None), (UUID(ID), None, 8.5)]
+
+    data = encode_copy_batch(batch, encoders)
+
+    assert bytes(data) == (
+        struct.pack(">h", 3)
+        + _field(UUID(ID).bytes)
+        + _field(b"Drama")
+        + NULL_FIELD
+        + struct.pack(">h", 3)
+        + _field(UUID(ID).bytes)
+        + NULL_FIELD
+        + _field(struct.pack(">d", 8.5))
+    )
@@ -0,0 +1,47 @@
+from datetime import date
+from uuid import UUID
+
+from sqlite_to_postgres.copy_rows import (
+    convert_row,
+    get_column_types,
+    get_converters,
+)
+from sqlite_to_postgres.load_plan import get_load_plan
+
+ID = "3d825f60-9fff-4dfe-b294-1a45fa1e115d"
+
+
+def test_column_types_follow_the_plan_columns():
+    plan = get_load_plan("genre")
+    rows = [
+        (column, oid, "text")
+        for oid, column in reversed(list(enumerate(plan.target_columns)))
+    ]
+
+    assert get_column_types(rows, plan) == [
+        (oid, "text") for oid in range(len(plan.target_columns))
+    ]
+
+
+def test_rows_are_converted_to_the_column_types():
+    converters = get_converters(
+        [(0, "uuid"), (0, "text"), (0, "date"), (0, "double precision")]
+    )
+
+    assert convert_row((ID, "Alien", "1979-05-25", 8), converters) == [
+        UUID(ID), "Alien", date(1979, 5, 25), 8.0
+    ]
+    assert convert_row((None,) * 4, converters) == [None] * 4
+
+
+def test_staging_queries_share_the_staging_table():
+    plan = get_load_plan("genre", "genre_reload")
+
+    assert plan.staging_query.startswith(
+        "CREATE TEMP TABLE IF NOT EXISTS genre_staging (LIKE content.genre "
+    )
+    assert plan.copy_query.startswith("COPY genre_staging (id, ")
+    assert plan.get_merge_query().startswith(
+        "INSERT INTO content.genre_reload "
+    )
+    assert "FROM genre_staging " in plan.get_merge_query()
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+import pytest
+
+from sqlite_to_postgres.metrics import EtlMetrics
+
+
+def _slow(batches, seconds):
+    for batch in batches:
+        time.sleep(seconds)
+        yield batch
+
+
+def _next_on_new_thread(iterator):
+    batches = []
+    thread = threading.Thread(
+        target=lambda: batches.append(next(iterator, None))
+    )
+    thread.start()
+    thread.join()
+    return batches[0]
+
+
+def test_any_other_file_than_prom_gets_json_lines(tmp_path):
+    metrics = EtlMetrics(metrics_file=str(tmp_path / "metrics.json"))
+
+    metrics.record_batch("genre", [("a",)], 0.1, 0.2)
+    metrics.export()
+
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "metrics.json").read_text().splitlines()
+    ]
+    assert [event["event"] for event in events] == ["batch", "table"]
+
+
+def test_the_format_can_be_set_explicitly(tmp_path):
+    metrics = EtlMetrics(
+        metrics_file=str(tmp_path / "metrics.txt"),
+        metrics_format="prometheus",
+    )
+
+    metrics.record_batch("genre", [("a",)], 0.1, 0.2)
+    metrics.export()
+
+    assert 'etl_rows{table="genre"} 1' in (
+        tmp_path / "metrics.txt"
+    ).read_text()
+    with pytest.raises(ValueError):
+        EtlMetrics(metrics_file=None, metrics_format="csv")
+
+
+def test_nested_stages_are_charged_once_across_threads():
+    metrics = EtlMetrics(metrics_file=None)
+    stack = []
+    extract = metrics.timed(
+        _slow([[1], [2]], 0.05), "genre", "extract", stack
+    )
+    transform = metrics.timed(
+        _slow(extract, 0.01), "genre", "transform", stack
+    )
+
+    while _next_on_new_thread(transform) is not None:
+        pass
+
+    table = metrics.tables["genre"]
+    assert table.extract_seconds >= 0.1
+    assert table.transform_seconds < 0.05
@@ -0,0 +1,41 @@
+import pytest
+
+from sqlite_to_postgres.options import EtlOptions, parse_shards
+
+
+def test_parse_shards_expands_globs_in_order(tmp_path):
+    for name in ("b.sqlite", "a.sqlite", "c.db"):
+        (tmp_path / name).touch()
+
+    shards = parse_shards(f"{tmp_path}/*.sqlite, {tmp_path}/c.db")
+
+    assert shards == tuple(
+        str(tmp_path / name) for name in ("a.sqlite", "b.sqlite", "c.db")
+    )
+    assert parse_shards("") == ()
+
+
+def test_parse_shards_rejects_unmatched_patterns(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        parse_shards(f"{tmp_path}/*.sqlite")
+
+
+def test_source_paths_fall_back_to_the_single_database():
+    options = EtlOptions(sqlite_path="movies.sqlite", shards=())
+
+    assert options.source_paths == ("movies.sqlite",)
+    assert options.source_key is None
+
+
+def test_shard_patterns_are_expanded_when_a_run_starts(tmp_path):
+    options = EtlOptions(shards=(f"{tmp_path}/*.sqlite",))
+    with pytest.raises(FileNotFoundError):
+        options.expand_shards()
+
+    (tmp_path / "a.sqlite").touch()
+
+    assert options.expand_shards().shards == (str(tmp_path / "a.sqlite"),)
+
+
+def test_pool_covers_every_worker_and_the_schema_fan_out():
+    assert EtlOptions(workers=8).pool_size >= 17
@@ -0,0 +1,53 @@
+import sqlite3
+
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+
+
+def _loader(tmp_path, rowids):
+    conn = sqlite3.connect(tmp_path / "db.sqlite")
+    conn.execute("CREATE TABLE genre (id TEXT PRIMARY KEY)")
+    conn.executemany(
+        "INSERT INTO genre (rowid, id) VALUES (?, ?)",
+        [(rowid, f"id-{rowid}") for rowid in rowids],
+    )
+    return SQLiteLoader(conn)
+
+
+def _covered(ranges, rowids):
+    return [
+        rowid for rowid in rowids
+        for start, end in ranges if start <= rowid < end
+    ]
+
+
+def test_ranges_split_the_rowids_without_overlap(tmp_path):
+    loader = _loader(tmp_path, range(1, 11))
+
+    ranges = loader.get_rowid_ranges("genre", 3)
+
+    assert ranges == [(1, 5), (5, 9), (9, 11)]
+    assert _covered(ranges, range(1, 11)) == list(range(1, 11))
+
+
+def test_ranges_span_gaps_in_the_rowids(tmp_path):
+    rowids = [1, 2, 50, 99, 100]
+    loader = _loader(tmp_path, rowids)
+
+    ranges = loader.get_rowid_ranges("genre", 2)
+
+    assert ranges == [(1, 51), (51, 101)]
+    assert _covered(ranges, rowids) == rowids
+
+
+def test_small_tables_stay_in_one_range(tmp_path):
+    loader = _loader(tmp_path, range(1, 11))
+
+    assert loader.get_rowid_ranges("genre", 4, min_rows=11) == [(1, 11)]
+    assert len(loader.get_rowid_ranges("genre", 4, min_rows=10)) == 4
+
+
+def test_empty_or_missing_tables_have_no_ranges(tmp_path):
+    loader = _loader(tmp_path, [])
+
+    assert loader.get_rowid_ranges("genre", 4) == []
+    assert loader.get_rowid_ranges("person", 4) == []
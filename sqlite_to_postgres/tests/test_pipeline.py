@@ -0,0 +1,29 @@
+import threading
+
+import pytest
+
+from sqlite_to_postgres.pipeline import run_stage
+
+
+def test_items_pass_through_in_order():
+    assert list(run_stage(run_stage(iter(range(100)), 2), 2)) == list(
+        range(100)
+    )
+
+
+def test_producer_error_is_raised_in_consumer():
+    def failing():
+        yield 1
+        raise ValueError("broken batch")
+
+    with pytest.raises(ValueError, match="broken batch"):
+        list(run_stage(failing(), 1))
+
+
+def test_closing_consumer_stops_producer():
+    threads = threading.active_count()
+    stage = run_stage(iter(range(1_000)), 1)
+    next(stage)
+    stage.close()
+
+    assert threading.active_count() == threads
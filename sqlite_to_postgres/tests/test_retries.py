@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from psycopg.errors import DeadlockDetected
+
+from sqlite_to_postgres.async_postgres_saver import AsyncPostgresSaver
+from sqlite_to_postgres.metrics import EtlMetrics
+from sqlite_to_postgres.retries import handle_retryable_error
+
+
+class AsyncConnection:
+    def __init__(self):
+        self.commits = self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def test_retry_is_recorded_until_the_attempts_run_out():
+    metrics = EtlMetrics(metrics_file=None)
+    error = DeadlockDetected()
+
+    handle_retryable_error(error, "genre", 0, 1, metrics)
+    with pytest.raises(DeadlockDetected):
+        handle_retryable_error(error, "genre", 1, 1, metrics)
+
+    assert metrics.tables["genre"].retries == 1
+
+
+def test_async_saver_writes_a_batch_again_after_a_deadlock():
+    connection = AsyncConnection()
+    metrics = EtlMetrics(metrics_file=None)
+    saver = AsyncPostgresSaver(connection, metrics=metrics, retries=2)
+    attempts = []
+
+    async def write_batch(batch):
+        attempts.append(batch)
+        if len(attempts) == 1:
+            raise DeadlockDetected()
+
+    asyncio.run(saver._save_batch([("a",)], "genre", write_batch))
+
+    assert len(attempts) == 2
+    assert (connection.rollbacks, connection.commits) == (1, 1)
+    assert metrics.tables["genre"].retries == 1
+    assert metrics.tables["genre"].rows == 1
+
+
+def test_async_saver_gives_up_after_the_last_retry():
+    connection = AsyncConnection()
+    saver = AsyncPostgresSaver(connection, retries=1)
+
+    async def write_batch(batch):
+        raise DeadlockDetected()
+
+    with pytest.raises(DeadlockDetected):
+        asyncio.run(saver._save_batch([("a",)], "genre", write_batch))
+    assert connection.rollbacks == 2
@@ -0,0 +1,42 @@
+import pytest
+
+from sqlite_to_postgres.scheduler import run_scheduled
+
+DEPENDENCIES = {
+    "genre": set(),
+    "person": set(),
+    "film_work": set(),
+    "genre_film_work": {"genre", "film_work"},
+    "person_film_work": {"person", "film_work"},
+}
+
+
+def test_parents_finish_before_children():
+    finished = []
+    run_scheduled(DEPENDENCIES, finished.append, max_workers=3)
+
+    assert sorted(finished) == sorted(DEPENDENCIES)
+    for table, parents in DEPENDENCIES.items():
+        assert all(
+            finished.index(parent) < finished.index(table)
+            for parent in parents
+        )
+
+
+def test_children_are_skipped_when_parent_fails():
+    started = []
+
+    def worker(table):
+        started.append(table)
+        if table == "genre":
+            raise ValueError(table)
+
+    with pytest.raises(RuntimeError):
+        run_scheduled(DEPENDENCIES, worker, max_workers=1)
+
+    assert "genre_film_work" not in started
+
+
+def test_cyclic_dependencies_are_rejected():
+    with pytest.raises(ValueError):
+        run_scheduled({"a": {"b"}, "b": {"a"}}, lambda table: None, 2)
@@ -0,0 +1,74 @@
+import os
+
+from sqlite_to_postgres.connections import sqlite_connection
+from sqlite_to_postgres.models import Genre
+from sqlite_to_postgres.sqlite_loader import SQLiteLoader
+
+
+def _create_genre(path: str):
+    with sqlite_connection(path) as conn:
+        conn.execute(
+            "CREATE TABLE genre (id TEXT PRIMARY KEY, name TEXT, "
+            "description TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)"
+        )
+        conn.executemany(
+            "INSERT INTO genre VALUES (?, ?, NULL, '2021-06-16', NULL)",
+            [(f"id-{index}", f"genre {index}") for index in range(5)],
+        )
+        conn.commit()
+
+
+def test_fast_read_extracts_plain_tuples(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    _create_genre(path)
+
+    with sqlite_connection(path, fast_read=True) as conn:
+        loader = SQLiteLoader(conn, fetch_size=2, raw_rows=True)
+        batches = list(loader.extract_data("genre"))
+        records = [
+            record
+            for batch in loader.transform_data(iter(batches), Genre)
+            for record in batch
+        ]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert all(type(row) is tuple for batch in batches for row in batch)
+    assert [record[:2] for record in records] == [
+        (f"id-{index}", f"genre {index}") for index in range(5)
+    ]
+    assert all(record[4] is not None for record in records)
+
+
+def test_resume_falls_back_to_the_range_when_the_id_is_gone(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    _create_genre(path)
+
+    with sqlite_connection(path) as conn:
+        loader = SQLiteLoader(conn, raw_rows=True)
+        resumed = [
+            row[0]
+            for batch in loader.extract_data("genre", after_id="id-2")
+            for row in batch
+        ]
+        conn.execute("DELETE FROM genre WHERE id = 'id-2'")
+        reloaded = [
+            row[0]
+            for batch in loader.extract_data("genre", (2, 5), "id-2")
+            for row in batch
+        ]
+
+    assert resumed == ["id-3", "id-4"]
+    assert reloaded == ["id-1", "id-3"]
+
+
+def test_read_only_modes_open_paths_with_uri_characters(tmp_path):
+    directory = tmp_path / "movies?#%20"
+    directory.mkdir()
+    path = str(directory / "db.sqlite")
+    _create_genre(path)
+
+    for options in ({"read_only": True}, {"fast_read": True}):
+        with sqlite_connection(path, **options) as conn:
+            count = conn.execute("SELECT count(*) FROM genre").fetchone()
+        assert count == (5,)
+    assert os.listdir(tmp_path) == ["movies?#%20"]
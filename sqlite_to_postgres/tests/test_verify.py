@@ -0,0 +1,66 @@
+import sqlite3
+from uuid import UUID, uuid4
+
+from sqlite_to_postgres.verify import (
+    MODULUS,
+    RowChecksum,
+    RowDiff,
+    canonical_value,
+    get_prefix_bounds,
+    merge_diff,
+    row_hash,
+)
+
+
+def test_canonical_value_matches_postgres_text():
+    assert canonical_value(None) == "\\N"
+    assert canonical_value(8.0) == "8"
+    assert canonical_value(7.5) == "7.5"
+    assert canonical_value("drama") == "drama"
+
+
+def test_prefix_bounds_cover_the_key_range():
+    assert get_prefix_bounds("") == (None, None)
+    assert get_prefix_bounds("a") == (
+        str(UUID("a0000000-0000-0000-0000-000000000000")),
+        str(UUID("b0000000-0000-0000-0000-000000000000")),
+    )
+    assert get_prefix_bounds("ff") == (
+        str(UUID("ff000000-0000-0000-0000-000000000000")),
+        None,
+    )
+
+
+def test_sqlite_checksum_is_order_independent():
+    rows = [(str(uuid4()), f"name {index}", None) for index in range(100)]
+    conn = sqlite3.connect(":memory:")
+    conn.create_aggregate("row_checksum", -1, RowChecksum)
+    conn.execute("CREATE TABLE genre (id TEXT, name TEXT, description TEXT)")
+
+    conn.executemany("INSERT INTO genre VALUES (?, ?, ?)", rows)
+    forward = conn.execute(
+        "SELECT row_checksum(id, name, description) FROM genre"
+    ).fetchone()[0]
+    conn.execute("DELETE FROM genre")
+    conn.executemany("INSERT INTO genre VALUES (?, ?, ?)", rows[::-1])
+    backward = conn.execute(
+        "SELECT row_checksum(id, name, description) FROM genre"
+    ).fetchone()[0]
+    conn.close()
+
+    assert forward == backward
+    assert forward % MODULUS == sum(row_hash(row) for row in rows) % MODULUS
+
+
+def test_merge_diff_yields_only_differences():
+    source = [("1", "a"), ("2", "b"), ("4", "d")]
+    target = [("2", "B"), ("3", "c"), ("4", "d"), ("5", "e")]
+
+    diffs = list(merge_diff(source, target))
+
+    assert diffs == [
+        RowDiff("missing", "1", source="a"),
+        RowDiff("changed", "2", "b", "B"),
+        RowDiff("extra", "3", target="c"),
+        RowDiff("extra", "5", target="e"),
+    ]
@@ -0,0 +1,407 @@
+import argparse
+import hashlib
+import logging
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+from uuid import UUID
+
+import psycopg
+from psycopg.rows import tuple_row
+
+from sqlite_to_postgres.connections import (
+    postgres_connection,
+    sqlite_connection,
+)
+from sqlite_to_postgres.db_settings import (
+    COLUMN_MAPPING,
+    FETCH_SIZE,
+    PG_DSL,
+    SQLITE_DB_PATH,
+    TABLE_MAPPING,
+    VERIFY_DIFF_ROWS,
+)
+from sqlite_to_postgres.load_plan import get_source_columns
+from sqlite_to_postgres.models import TIMESTAMP_COLUMNS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NULL = "\\N"
+SEPARATOR = "\x1f"
+MODULUS = 2 ** 64
+UUID_HEX_LENGTH = 32
+
+
+def get_verify_columns(table_name: str) -> tuple[str, ...]:
+    # timestamps missing in SQLite are filled in at load time
+    return tuple(
+        col
+        for col in get_source_columns(TABLE_MAPPING[table_name])
+        if col not in TIMESTAMP_COLUMNS
+    )
+
+
+def canonical_value(value) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, float):
+        # matches the shortest float8 text Postgres prints, which has no ".0"
+        text = repr(value)
+        return text[:-2] if text.endswith(".0") else text
+    return str(value)
+
+
+def get_pg_row_text(table_name: str) -> str:
+    return "concat_ws(chr(31), {})".format(
+        ", ".join(
+            f"coalesce({COLUMN_MAPPING.get(col, col)}::text, '{NULL}')"
+            for col in get_verify_columns(table_name)
+        )
+    )
+
+
+def pin_text_formats(pg_conn: psycopg.Connection):
+    # the text forms rows are compared by must not depend on the session
+    with pg_conn.cursor() as cursor:
+        cursor.execute("SET DateStyle TO ISO")
+        cursor.execute("SET extra_float_digits TO 1")
+    pg_conn.commit()
+
+
+def row_text(values) -> str:
+    return SEPARATOR.join(canonical_value(value) for value in values)
+
+
+def row_hash(values) -> int:
+    digest = hashlib.md5(row_text(values).encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class RowChecksum:
+    # sqlite3 aggregate: an order-independent sum of row hashes modulo 2^64
+    def __init__(self):
+        self.checksum = 0
+
+    def step(self, *values):
+        self.checksum = (self.checksum + row_hash(values)) % MODULUS
+
+    def finalize(self) -> int:
+        # SQLite integers are signed 64-bit
+        if self.checksum >= MODULUS // 2:
+            return self.checksum - MODULUS
+        return self.checksum
+
+
+def get_prefix_bounds(prefix: str) -> tuple[str | None, str | None]:
+    if not prefix:
+        return None, None
+    shift = 4 * (UUID_HEX_LENGTH - len(prefix))
+    value = int(prefix, 16)
+    upper = None
+    if value + 1 < 16 ** len(prefix):
+        upper = str(UUID(int=(value + 1) << shift))
+    return str(UUID(int=value << shift)), upper
+
+
+@dataclass(slots=True)
+class TableReport:
+    table_name: str
+    source_rows: int = 0
+    target_rows: int = 0
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    mismatches: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatches == 0
+
+
+class TableVerifier:
+    def __init__(
+            self,
+            sqlite_conn: sqlite3.Connection,
+            pg_conn: psycopg.Connection,
+            table_name: str,
+            max_diff_rows: int = VERIFY_DIFF_ROWS,
+            max_reported: int = 100,
+    ):
+        self.sqlite_conn = sqlite_conn
+        self.pg_conn = pg_conn
+        self.table_name = table_name
+        self.max_diff_rows = max_diff_rows
+        self.max_reported = max_reported
+        self.columns = get_verify_columns(table_name)
+        self.sqlite_conn.create_aggregate("row_checksum", -1, RowChecksum)
+        self.pg_row_text = get_pg_row_text(table_name)
+
+    def _sqlite_range(self, prefix: str) -> tuple[str, list]:
+        lower, upper = get_prefix_bounds(prefix)
+        conditions, params = [], []
+        if lower:
+            conditions.append("id >= ?")
+            params.append(lower)
+        if upper:
+            conditions.append("id < ?")
+            params.append(upper)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return where, params
+
+    def _pg_range(self, prefix: str) -> tuple[str, list]:
+        lower, upper = get_prefix_bounds(prefix)
+        conditions, params = [], []
+        if lower:
+            conditions.append("id >= %s::uuid")
+            params.append(lower)
+        if upper:
+            conditions.append("id < %s::uuid")
+            params.append(upper)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return where, params
+
+    def _sqlite_checksums(
+            self, prefix: str, depth: int
+    ) -> dict[str, tuple[int, int]]:
+        where, params = self._sqlite_range(prefix)
+        group = f"substr(replace(id, '-', ''), 1, {depth})"
+        cursor = self.sqlite_conn.execute(
+            f"SELECT {group}, COUNT(*), "
+            f"row_checksum({', '.join(self.columns)}) "
+            f"FROM {self.table_name} {where}GROUP BY {group}",
+            params,
+        )
+        return {
+            key: (count, checksum % MODULUS)
+            for key, count, checksum in cursor
+        }
+
+    def _pg_checksums(
+            self, prefix: str, depth: int
+    ) -> dict[str, tuple[int, int]]:
+        where, params = self._pg_range(prefix)
+        group = f"left(replace(id::text, '-', ''), {depth})"
+        with self.pg_conn.cursor(row_factory=tuple_row) as cursor:
+            cursor.execute(
+                f"SELECT {group}, COUNT(*), COALESCE(SUM("
+                f"('x' || left(md5({self.pg_row_text}), 16))::bit(64)::bigint"
+                f"), 0) FROM content.{self.table_name} {where}"
+                f"GROUP BY {group}",
+                params,
+            )
+            return {
+                key: (count, int(checksum) % MODULUS)
+                for key, count, checksum in cursor
+            }
+
+    def _sqlite_rows(self, prefix: str) -> dict[str, str]:
+        where, params = self._sqlite_range(prefix)
+        cursor = self.sqlite_conn.execute(
+            f"SELECT id, {', '.join(self.columns)} "
+            f"FROM {self.table_name} {where}",
+            params,
+        )
+        return {row[0]: row_text(row[1:]) for row in cursor}
+
+    def _pg_rows(self, prefix: str) -> dict[str, str]:
+        where, params = self._pg_range(prefix)
+        with self.pg_conn.cursor(row_factory=tuple_row) as cursor:
+            cursor.execute(
+                f"SELECT id::text, {self.pg_row_text} "
+                f"FROM content.{self.table_name} {where}",
+                params,
+            )
+            return dict(cursor)
+
+    def _report(self, report: TableReport, kind: str, row_id: str):
+        report.mismatches += 1
+        ids = getattr(report, kind)
+        if len(ids) < self.max_reported:
+            ids.append(row_id)
+
+    def _diff_rows(self, report: TableReport, prefix: str):
+        source, target = self._sqlite_rows(prefix), self._pg_rows(prefix)
+        for row_id, text in source.items():
+            if row_id not in target:
+                self._report(report, "missing", row_id)
+            elif target[row_id] != text:
+                self._report(report, "changed", row_id)
+        for row_id in target.keys() - source.keys():
+            self._report(report, "extra", row_id)
+
+    def _bisect(self, report: TableReport, prefix: str):
+        depth = len(prefix) + 1
+        source = self._sqlite_checksums(prefix, depth)
+        target = self._pg_checksums(prefix, depth)
+        for key in sorted(source.keys() | target.keys()):
+            source_sum, target_sum = source.get(key), target.get(key)
+            if source_sum == target_sum:
+                continue
+            rows = max(
+                value[0] for value in (source_sum, target_sum) if value
+            )
+            if rows <= self.max_diff_rows or depth == UUID_HEX_LENGTH:
+                self._diff_rows(report, key)
+            else:
+                self._bisect(report, key)
+
+    def verify(self) -> TableReport:
+        report = TableReport(self.table_name)
+        source = self._sqlite_checksums("", 0).get("", (0, 0))
+        target = self._pg_checksums("", 0).get("", (0, 0))
+        report.source_rows, report.target_rows = source[0], target[0]
+        if source != target:
+            logger.info(
+                "Checksums of the table '%s' differ, narrowing down",
+                self.table_name,
+            )
+            self._bisect(report, "")
+        self.pg_conn.commit()
+        return report
+
+
+@dataclass(frozen=True, slots=True)
+class RowDiff:
+    kind: str
+    row_id: str
+    source: str | None = None
+    target: str | None = None
+
+
+def merge_diff(
+        source: Iterable[tuple[str, str]], target: Iterable[tuple[str, str]]
+) -> Iterator[RowDiff]:
+    # both sides are (id, row text) pairs sorted by id
+    source, target = iter(source), iter(target)
+    source_row, target_row = next(source, None), next(target, None)
+    while source_row or target_row:
+        if target_row is None or (
+                source_row is not None and source_row[0] < target_row[0]
+        ):
+            yield RowDiff("missing", source_row[0], source=source_row[1])
+            source_row = next(source, None)
+        elif source_row is None or target_row[0] < source_row[0]:
+            yield RowDiff("extra", target_row[0], target=target_row[1])
+            target_row = next(target, None)
+        else:
+            if source_row[1] != target_row[1]:
+                yield RowDiff(
+                    "changed", source_row[0], source_row[1], target_row[1]
+                )
+            source_row, target_row = next(source, None), next(target, None)
+
+
+def iter_row_diffs(
+        sqlite_conn: sqlite3.Connection,
+        pg_conn: psycopg.Connection,
+        table_name: str,
+        fetch_size: int = FETCH_SIZE,
+) -> Iterator[RowDiff]:
+    # lowercase UUID text sorts in SQLite the same way uuid does in Postgres
+    columns = ", ".join(get_verify_columns(table_name))
+    pin_text_formats(pg_conn)
+    sqlite_cursor = sqlite_conn.cursor()
+    sqlite_cursor.arraysize = fetch_size
+    try:
+        sqlite_cursor.execute(
+            f"SELECT id, {columns} FROM {table_name} ORDER BY id"
+        )
+        with pg_conn.cursor(
+                name=f"{table_name}_diff", row_factory=tuple_row
+        ) as pg_cursor:
+            pg_cursor.itersize = fetch_size
+            pg_cursor.execute(
+                f"SELECT id::text, {get_pg_row_text(table_name)} "
+                f"FROM content.{table_name} ORDER BY id"
+            )
+            yield from merge_diff(
+                ((row[0], row_text(row[1:])) for row in sqlite_cursor),
+                pg_cursor,
+            )
+    finally:
+        sqlite_cursor.close()
+    pg_conn.commit()
+
+
+def verify_tables(
+        sqlite_conn: sqlite3.Connection,
+        pg_conn: psycopg.Connection,
+        tables=TABLE_MAPPING,
+        max_diff_rows: int = VERIFY_DIFF_ROWS,
+) -> list[TableReport]:
+    pin_text_formats(pg_conn)
+    return [
+        TableVerifier(sqlite_conn, pg_conn, table, max_diff_rows).verify()
+        for table in tables
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the SQLite source and PostgreSQL target by "
+                    "checksums and list the rows that differ"
+    )
+    parser.add_argument(
+        "--tables", nargs="+", choices=list(TABLE_MAPPING),
+        default=list(TABLE_MAPPING),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="skip the checksums and merge-diff every row of both sides",
+    )
+    parser.add_argument(
+        "--max-diff-rows", type=int, default=VERIFY_DIFF_ROWS,
+        help="compare ranges row by row once they hold this many rows",
+    )
+    return parser.parse_args()
+
+
+def stream_tables(
+        sqlite_conn: sqlite3.Connection,
+        pg_conn: psycopg.Connection,
+        tables=TABLE_MAPPING,
+        max_reported: int = 100,
+) -> list[TableReport]:
+    reports = []
+    for table in tables:
+        report = TableReport(table)
+        report.source_rows = sqlite_conn.execute(
+            f"SELECT COUNT(*) FROM {table}"
+        ).fetchone()[0]
+        with pg_conn.cursor(row_factory=tuple_row) as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM content.{table}")
+            report.target_rows = cursor.fetchone()[0]
+        for diff in iter_row_diffs(sqlite_conn, pg_conn, table):
+            report.mismatches += 1
+            ids = getattr(report, diff.kind)
+            if len(ids) < max_reported:
+                ids.append(diff.row_id)
+        reports.append(report)
+    return reports
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with (
+        sqlite_connection(SQLITE_DB_PATH, read_only=True) as sqlite_conn,
+        postgres_connection(PG_DSL) as pg_conn,
+    ):
+        if args.stream:
+            reports = stream_tables(sqlite_conn, pg_conn, args.tables)
+        else:
+            reports = verify_tables(
+                sqlite_conn, pg_conn, args.tables, args.max_diff_rows
+            )
+    for report in reports:
+        logger.info(
+            "%s: %s source rows, %s target rows, %s mismatches",
+            report.table_name, report.source_rows, report.target_rows,
+            report.mismatches,
+        )
+        for kind in ("missing", "extra", "changed"):
+            for row_id in getattr(report, kind):
+                logger.info("  %s %s", kind, row_id)
+    sys.exit(0 if all(report.ok for report in reports) else 1)